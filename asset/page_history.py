@@ -0,0 +1,157 @@
+from datetime import datetime
+from PyQt6.QtWidgets import (
+    QVBoxLayout,
+    QLabel, QLineEdit, QListView,
+    QTextEdit, QSplitter, QWidget
+)
+from PyQt6.QtCore import Qt, QTimer, QAbstractListModel, QModelIndex
+from PyQt6.QtGui import QFont
+
+from base_page import BasePage
+
+TASK_LABELS = {
+    "translation": "<=> Translation",
+    "text_summary": "--- Text Summary",
+    "video_summary": "[>] Video Summary",
+}
+
+
+class HistoryListModel(QAbstractListModel):
+    """
+    List model over HistoryStore.search() that loads rows lazily.
+    Qt calls canFetchMore/fetchMore as the user scrolls, so only the visible
+    pages are ever queried and kept in memory.
+    """
+    PAGE_SIZE = 50
+
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.query = ""
+        self.rows = []
+        self.exhausted = False
+
+    def set_query(self, query):
+        """Resets the model to the first page of a new search."""
+        self.beginResetModel()
+        self.query = query
+        self.rows = []
+        self.exhausted = False
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.exhausted:
+            return
+        before_id = self.rows[-1]["id"] if self.rows else None
+        page = self.store.search(self.query, limit=self.PAGE_SIZE, before_id=before_id)
+        if len(page) < self.PAGE_SIZE:
+            self.exhausted = True
+        if not page:
+            return
+        self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(page) - 1)
+        self.rows.extend(page)
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            created = datetime.fromtimestamp(row["created"]).strftime("%Y-%m-%d %H:%M")
+            task = TASK_LABELS.get(row["task"], row["task"])
+            preview = " ".join((row["source"] or row["input_preview"]).split())[:80]
+            return f"[{created}] {task} ({row['model']})\n{preview}"
+        if role == Qt.ItemDataRole.UserRole:
+            return row["id"]
+        return None
+
+
+class HistoryPage(BasePage):
+    """Page to search and re-open previous results."""
+    def __init__(self, llm_connector):
+        super().__init__(llm_connector)
+        self.store = self.llm_connector.history_store
+        layout = QVBoxLayout(self)
+
+        # ASCII Icon: [#] (Archive)
+        title = QLabel("[#] History")
+        title.setFont(QFont("Arial", 24, QFont.Weight.Bold))
+        layout.addWidget(title, alignment=Qt.AlignmentFlag.AlignCenter)
+
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search previous translations and summaries...")
+        self.search_input.setMinimumHeight(32)
+        layout.addWidget(self.search_input)
+
+        self.model = HistoryListModel(self.store, self)
+        self.list_view = QListView()
+        self.list_view.setModel(self.model)
+        self.list_view.setUniformItemSizes(True)
+
+        self.detail_output = QTextEdit()
+        self.detail_output.setReadOnly(True)
+        self.detail_output.setPlaceholderText("Select an entry to see the full result.")
+
+        self.detail_label = QLabel("")
+        self.detail_label.setFont(QFont("Segoe UI", 9))
+        self.detail_label.setStyleSheet("color: #7F8C8D;")
+
+        detail_layout = QVBoxLayout()
+        detail_layout.addWidget(self.detail_label)
+        detail_layout.addWidget(self.detail_output)
+
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+        splitter.addWidget(self.list_view)
+        detail_container = QWidget()
+        detail_container.setLayout(detail_layout)
+        splitter.addWidget(detail_container)
+        splitter.setSizes([350, 450])
+        layout.addWidget(splitter)
+
+        layout.setContentsMargins(50, 20, 50, 20)
+
+        # Debounce typing so each keystroke does not run a query
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(150)
+        self.search_timer.timeout.connect(self.refresh)
+        self.search_input.textChanged.connect(self.search_timer.start)
+
+        self.list_view.selectionModel().currentChanged.connect(self.show_entry)
+
+    def showEvent(self, event):
+        """Reloads the list whenever the page becomes visible (new results may exist)."""
+        super().showEvent(event)
+        self.refresh()
+
+    def refresh(self):
+        self.model.set_query(self.search_input.text())
+        self.detail_output.clear()
+        self.detail_label.setText("")
+
+    def show_entry(self, current, previous):
+        """Loads the full output of the selected entry on demand."""
+        entry_id = current.data(Qt.ItemDataRole.UserRole)
+        if entry_id is None:
+            return
+        entry = self.store.get(entry_id)
+        if not entry:
+            return
+
+        details = [TASK_LABELS.get(entry["task"], entry["task"]), f"Model: {entry['model']}"]
+        if entry["source"]:
+            details.append(f"Source: {entry['source']}")
+        if entry["duration_ms"]:
+            details.append(f"Took {entry['duration_ms'] / 1000:.1f} s")
+        if entry["prompt_eval_ms"] is not None:
+            details.append(f"Prompt eval {entry['prompt_eval_ms']} ms, generation {entry['eval_ms']} ms")
+
+        self.detail_label.setText(" | ".join(details))
+        self.detail_output.setText(entry["output"])
@@ -2,11 +2,12 @@ from PyQt6.QtWidgets import (
     QVBoxLayout, QHBoxLayout, 
     QPushButton, QLabel,
     QTextEdit, QSizePolicy, 
+    QLineEdit, QMessageBox,
 )
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont
 
-from helper.ollama_worker import TextSummaryWorker
+from helper.ollama_worker import TextSummaryWorker, FollowUpWorker, FileSummaryWorker
 from base_page import BasePage 
 
 class TextSummaryPage(BasePage):
@@ -14,6 +15,14 @@ class TextSummaryPage(BasePage):
     
     # Instance variable to hold the active worker thread
     thread = None 
+
+    # This prompt asks the model to output the summary in English by default.
+    SYSTEM_PROMPT = (
+        "You are an expert text summarizer. "
+        "Your task is to analyze the user's input text and generate a concise, "
+        "well-structured summary of the key information. "
+        "The final summary **must be in English**, and you must **only** output the summary text."
+    )
     
     def __init__(self, llm_connector):
         super().__init__(llm_connector)
@@ -34,20 +43,63 @@ class TextSummaryPage(BasePage):
         self.summary_output.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
         
         layout.addWidget(self.input_text)
+
+        # Large files are streamed from disk; the input box then only shows a preview
+        self.document = None
+        self.file_label = QLabel("")
+        self.file_label.setFont(QFont("Segoe UI", 9))
+        self.file_label.setStyleSheet("color: #7F8C8D;")
+        self.file_label.hide()
+        layout.addWidget(self.file_label)
         
         self.summarize_button = QPushButton("Generate Summary")
         self.summarize_button.setFixedSize(200, 40)
         self.summarize_button.setStyleSheet("background-color: #3498DB; color: white; border-radius: 5px;")
+
+        self.open_file_button = QPushButton("Open File...")
+        self.open_file_button.setFixedSize(120, 40)
+        self.clear_file_button = QPushButton("Clear File")
+        self.clear_file_button.setFixedSize(120, 40)
+        self.clear_file_button.hide()
         
         h_layout = QHBoxLayout()
-        h_layout.addWidget(self.summarize_button, alignment=Qt.AlignmentFlag.AlignCenter)
+        h_layout.addStretch()
+        h_layout.addWidget(self.open_file_button)
+        h_layout.addWidget(self.summarize_button)
+        h_layout.addWidget(self.clear_file_button)
+        h_layout.addStretch()
         layout.addLayout(h_layout)
         
         layout.addWidget(self.summary_output)
+
+        # Follow-up row: questions are asked on the same session as the summary,
+        # so the document is not re-evaluated by the model.
+        self.follow_up_input = QLineEdit()
+        self.follow_up_input.setPlaceholderText("Ask a follow-up about this document (e.g. 'summarize section 3 in more detail')...")
+        self.follow_up_input.setMinimumHeight(32)
+        self.follow_up_button = QPushButton("Ask Follow-up")
+        self.follow_up_button.setFixedSize(150, 32)
+        self.follow_up_button.setStyleSheet("background-color: #3498DB; color: white; border-radius: 5px;")
+        self.follow_up_button.setDisabled(True)
+
+        follow_up_layout = QHBoxLayout()
+        follow_up_layout.addWidget(self.follow_up_input)
+        follow_up_layout.addWidget(self.follow_up_button)
+        layout.addLayout(follow_up_layout)
+
+        self.telemetry_label = QLabel("")
+        self.telemetry_label.setFont(QFont("Segoe UI", 9))
+        self.telemetry_label.setStyleSheet("color: #7F8C8D;")
+        layout.addWidget(self.telemetry_label)
+
         layout.setContentsMargins(50, 20, 50, 20)
         
         # --- LLM Integration ---
         self.summarize_button.clicked.connect(self.run_summarization)
+        self.open_file_button.clicked.connect(self.open_file)
+        self.clear_file_button.clicked.connect(self.clear_file)
+        self.follow_up_button.clicked.connect(self.run_follow_up)
+        self.follow_up_input.returnPressed.connect(self.run_follow_up)
         
         if not self.llm_connector.is_model_ready:
             self.summarize_button.setDisabled(True)
@@ -56,23 +108,87 @@ class TextSummaryPage(BasePage):
     # --- Core Logic Methods ---
     def run_summarization(self):
         """Starts the non-blocking summarization process."""
+        self.start_summarization(use_cache=True)
+
+    def open_file(self):
+        """Selects a document to stream from disk and shows only its beginning."""
+        document = self.open_document()
+        if document is None:
+            return
+        try:
+            preview = document.preview()
+        except Exception as e:
+            QMessageBox.warning(self, "Cannot Read File", str(e))
+            return
+
+        self.document = document
+        self.input_text.setPlainText(preview)
+        self.input_text.setReadOnly(True)
+        self.file_label.setText(
+            f"File: {document.name} ({document.size_bytes / 2**20:.1f} MB) - "
+            f"preview of the first {len(preview):,} characters, the whole file will be summarized."
+        )
+        self.file_label.show()
+        self.clear_file_button.show()
+
+    def clear_file(self):
+        """Returns to pasting text."""
+        self.document = None
+        self.input_text.clear()
+        self.input_text.setReadOnly(False)
+        self.file_label.hide()
+        self.clear_file_button.hide()
+
+    def start_file_summarization(self):
+        """Summarizes the opened file chunk by chunk without loading it into the UI."""
+        self.begin_request(self.document.path)
+        self.summary_output.setText(f"Reading {self.document.name}...")
+        self.summarize_button.setDisabled(True)
+        self.follow_up_button.setDisabled(True)
+        self.telemetry_label.setText("")
+
+        self.thread = FileSummaryWorker(
+            client=self.llm_connector.client,
+            model_name=self.llm_connector.model,
+            document=self.document,
+            system_prompt=self.SYSTEM_PROMPT,
+            chunk_chars=self.chunk_chars("text_summary"),
+            admission=self.llm_connector.admission,
+            **self.llm_connector.generation_kwargs("text_summary")
+        )
+        self.session = self.thread.session
+
+        self.thread.result_ready.connect(self.display_summary)
+        self.thread.result_ready.connect(
+            lambda text, document=self.document: self.record_history(
+                "text_summary", text, source=document.path, input_hash=document.content_hash or ""))
+        self.thread.telemetry_ready.connect(self.telemetry_label.setText)
+        self.thread.progress_update.connect(self.summary_output.setText)
+        self.thread.error_occurred.connect(self.handle_llm_error)
+        self.thread.finished.connect(self.thread_finished_cleanup)
+
+        self.thread.start()
+
+    def start_summarization(self, use_cache):
+        """Starts the worker; use_cache=False skips the near-duplicate lookup."""
+        if self.document is not None:
+            self.start_file_summarization()
+            return
+
         source_text = self.input_text.toPlainText().strip()
         
         if not source_text:
             self.summary_output.setText("Please paste text into the input box to summarize.")
             return
 
+        self.begin_request(source_text)
         self.summary_output.setText("Generating summary using local LLM...")
         self.summarize_button.setDisabled(True)
+        self.follow_up_button.setDisabled(True)
+        self.telemetry_label.setText("")
 
         # Define the specific system instruction for the LLM task
-        # This prompt asks the model to output the summary in English by default.
-        system_prompt = (
-            "You are an expert text summarizer. "
-            "Your task is to analyze the user's input text and generate a concise, "
-            "well-structured summary of the key information. "
-            "The final summary **must be in English**, and you must **only** output the summary text."
-        )
+        system_prompt = self.SYSTEM_PROMPT
 
         # Initialize and start the worker thread
         # Note: We use the existing OllamaWorker, passing the prompt and system prompt.
@@ -80,11 +196,22 @@ class TextSummaryPage(BasePage):
             client=self.llm_connector.client,
             model_name=self.llm_connector.model,
             prompt=source_text,
-            system_prompt=system_prompt
+            system_prompt=system_prompt,
+            cache=self.llm_connector.semantic_cache,
+            use_cache=use_cache,
+            admission=self.llm_connector.admission,
+            **self.llm_connector.generation_kwargs("text_summary")
         )
         
+        # A new document starts a new session; follow-ups reuse it
+        self.session = self.thread.session
+
         # Connect signals
         self.thread.result_ready.connect(self.display_summary)
+        self.thread.result_ready.connect(lambda text: self.record_history("text_summary", text))
+        self.thread.telemetry_ready.connect(self.telemetry_label.setText)
+        self.thread.cache_hit.connect(self.handle_cache_hit)
+        self.thread.progress_update.connect(self.summary_output.setText)
         self.thread.error_occurred.connect(self.handle_llm_error)
         
         # CRITICAL: Connect the finished signal for cleanup
@@ -92,11 +219,51 @@ class TextSummaryPage(BasePage):
 
         self.thread.start()
 
+    def run_follow_up(self):
+        """Asks a follow-up question on the current document's session."""
+        question = self.follow_up_input.text().strip()
+
+        if not question or self.session is None or not self.session.has_history:
+            return
+        if self.thread and self.thread.isRunning():
+            return
+
+        self.begin_request(question)
+        self.summary_output.setText("Answering follow-up using the cached document context...")
+        self.summarize_button.setDisabled(True)
+        self.follow_up_button.setDisabled(True)
+        self.telemetry_label.setText("")
+
+        self.thread = FollowUpWorker(session=self.session, question=question, task="text_summary",
+                                     admission=self.llm_connector.admission)
+
+        self.thread.progress_update.connect(self.summary_output.setText)
+        self.thread.result_ready.connect(self.display_summary)
+        self.thread.result_ready.connect(lambda text: self.record_history("text_summary", text))
+        self.thread.telemetry_ready.connect(self.telemetry_label.setText)
+        self.thread.error_occurred.connect(self.handle_llm_error)
+        self.thread.finished.connect(self.thread_finished_cleanup)
+
+        self.thread.start()
+
     # --- Slot handles ---
     def display_summary(self, summary):
         """Handles the successful result from the worker thread."""
         self.summary_output.setText(summary)
         self.summarize_button.setDisabled(False) 
+        self.follow_up_input.clear()
+        self.follow_up_button.setDisabled(self.session is None or not self.session.has_history)
+
+    def handle_cache_hit(self, summary, similarity):
+        """Offers a previous summary of a near-identical document."""
+        if self.confirm_cached_result(similarity):
+            self.display_summary(summary)
+            self.telemetry_label.setText(f"Reused cached summary (similarity {similarity * 100:.1f}%)")
+        elif self.thread is None:
+            # The worker already finished while the dialog was open
+            self.start_summarization(use_cache=False)
+        else:
+            self.rerun_without_cache = True
 
     def handle_llm_error(self, error_message):
         """Custom handler to reset UI after an error."""
@@ -104,6 +271,7 @@ class TextSummaryPage(BasePage):
         super().handle_llm_error(error_message, title="Summarization Error")
         self.summary_output.setText("Summary generation failed. See error details above.")
         self.summarize_button.setDisabled(False)
+        self.follow_up_button.setDisabled(self.session is None or not self.session.has_history)
         
     def thread_finished_cleanup(self):
         """Cleans up the QThread object after it has fully finished."""
@@ -112,4 +280,8 @@ class TextSummaryPage(BasePage):
         if self.thread:
             self.thread.wait() 
         
-        self.thread = None
\ No newline at end of file
+        self.thread = None
+
+        if self.rerun_without_cache:
+            self.rerun_without_cache = False
+            self.start_summarization(use_cache=False)
\ No newline at end of file
@@ -7,7 +7,7 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont
 
-from helper.ollama_worker import VideoSummaryWorker
+from helper.ollama_worker import VideoSummaryWorker, FollowUpWorker
 from base_page import BasePage 
 
 class VideoSummaryPage(BasePage):
@@ -59,10 +59,32 @@ class VideoSummaryPage(BasePage):
         self.summary_output.setPlaceholderText("Summary of the video content will appear here.")
         
         layout.addWidget(self.summary_output)
+
+        # Follow-up row: reuses the transcript already evaluated by the model
+        self.follow_up_input = QLineEdit()
+        self.follow_up_input.setPlaceholderText("Ask a follow-up about this video (e.g. 'translate the summary to French')...")
+        self.follow_up_input.setMinimumHeight(32)
+        self.follow_up_button = QPushButton("Ask Follow-up")
+        self.follow_up_button.setFixedSize(150, 32)
+        self.follow_up_button.setStyleSheet("background-color: #E74C3C; color: white; border-radius: 5px;")
+        self.follow_up_button.setDisabled(True)
+
+        follow_up_layout = QHBoxLayout()
+        follow_up_layout.addWidget(self.follow_up_input)
+        follow_up_layout.addWidget(self.follow_up_button)
+        layout.addLayout(follow_up_layout)
+
+        self.telemetry_label = QLabel("")
+        self.telemetry_label.setFont(QFont("Segoe UI", 9))
+        self.telemetry_label.setStyleSheet("color: #7F8C8D;")
+        layout.addWidget(self.telemetry_label)
+
         layout.setContentsMargins(50, 20, 50, 20)
         
         # --- LLM Integration ---
         self.fetch_button.clicked.connect(self.run_video_summary)
+        self.follow_up_button.clicked.connect(self.run_follow_up)
+        self.follow_up_input.returnPressed.connect(self.run_follow_up)
         
         if not self.llm_connector.is_model_ready:
             self.fetch_button.setDisabled(True)
@@ -71,25 +93,72 @@ class VideoSummaryPage(BasePage):
     # --- Core Logic Methods ---
     def run_video_summary(self):
         """Starts the non-blocking video fetching and summarization process."""
+        self.start_video_summary(use_cache=True)
+
+    def start_video_summary(self, use_cache):
+        """Starts the worker; use_cache=False skips the near-duplicate lookup."""
         video_url = self.url_input.text().strip()
+        self.video_url = video_url
         
         if not video_url:
             self.summary_output.setText("Please enter a video URL.")
             return
 
+        self.begin_request(video_url)
         self.summary_output.setText("Starting video processing...")
         self.fetch_button.setDisabled(True)
+        self.follow_up_button.setDisabled(True)
+        self.telemetry_label.setText("")
 
         # Initialize and start the worker thread
         self.thread = VideoSummaryWorker(
             client=self.llm_connector.client,
             model_name=self.llm_connector.model,
-            video_url=video_url
+            video_url=video_url,
+            cache=self.llm_connector.semantic_cache,
+            use_cache=use_cache,
+            admission=self.llm_connector.admission,
+            **self.llm_connector.generation_kwargs("video_summary")
         )
         
+        # A new video starts a new session; follow-ups reuse it
+        self.session = self.thread.session
+
         # Connect signals
         self.thread.progress_update.connect(self.display_progress)
         self.thread.result_ready.connect(self.display_summary)
+        self.thread.result_ready.connect(
+            lambda text, url=self.video_url: self.record_history("video_summary", text, source=url))
+        self.thread.telemetry_ready.connect(self.telemetry_label.setText)
+        self.thread.cache_hit.connect(self.handle_cache_hit)
+        self.thread.error_occurred.connect(self.handle_llm_error)
+        self.thread.finished.connect(self.thread_finished_cleanup)
+
+        self.thread.start()
+
+    def run_follow_up(self):
+        """Asks a follow-up question on the current video's session."""
+        question = self.follow_up_input.text().strip()
+
+        if not question or self.session is None or not self.session.has_history:
+            return
+        if self.thread and self.thread.isRunning():
+            return
+
+        self.begin_request(question)
+        self.summary_output.setText("Answering follow-up using the cached transcript context...")
+        self.fetch_button.setDisabled(True)
+        self.follow_up_button.setDisabled(True)
+        self.telemetry_label.setText("")
+
+        self.thread = FollowUpWorker(session=self.session, question=question, task="video_summary",
+                                     admission=self.llm_connector.admission)
+
+        self.thread.progress_update.connect(self.display_progress)
+        self.thread.result_ready.connect(self.display_summary)
+        self.thread.result_ready.connect(
+            lambda text, url=self.video_url: self.record_history("video_summary", text, source=url))
+        self.thread.telemetry_ready.connect(self.telemetry_label.setText)
         self.thread.error_occurred.connect(self.handle_llm_error)
         self.thread.finished.connect(self.thread_finished_cleanup)
 
@@ -104,12 +173,25 @@ class VideoSummaryPage(BasePage):
         """Handles the successful result from the worker thread."""
         self.summary_output.setText(summary)
         self.fetch_button.setDisabled(False) 
+        self.follow_up_input.clear()
+        self.follow_up_button.setDisabled(self.session is None or not self.session.has_history)
+
+    def handle_cache_hit(self, summary, similarity):
+        """Offers a previous summary of a near-identical transcript."""
+        if self.confirm_cached_result(similarity):
+            self.display_summary(summary)
+            self.telemetry_label.setText(f"Reused cached summary (similarity {similarity * 100:.1f}%)")
+        elif self.thread is None:
+            self.start_video_summary(use_cache=False)
+        else:
+            self.rerun_without_cache = True
 
     def handle_llm_error(self, error_message):
         """Custom handler to reset UI after an error."""
         super().handle_llm_error(error_message, title="Video Summary Error")
         self.summary_output.setText(f"Video summary failed. Details: {error_message}")
         self.fetch_button.setDisabled(False)
+        self.follow_up_button.setDisabled(self.session is None or not self.session.has_history)
         
     def thread_finished_cleanup(self):
         """Cleans up the QThread object after it has fully finished."""
@@ -117,4 +199,8 @@ class VideoSummaryPage(BasePage):
         if self.thread:
             self.thread.wait() 
         
-        self.thread = None
\ No newline at end of file
+        self.thread = None
+
+        if self.rerun_without_cache:
+            self.rerun_without_cache = False
+            self.start_video_summary(use_cache=False)
\ No newline at end of file
@@ -1,13 +1,15 @@
+import os
 import sys
 from PyQt6.QtWidgets import (
     QVBoxLayout, QHBoxLayout, 
     QPushButton, QLabel,
-    QTextEdit, QComboBox 
+    QTextEdit, QComboBox,
+    QMessageBox
 ) 
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont
 
-from helper.ollama_worker import OllamaWorkerTranslate # MUST be the updated worker
+from helper.ollama_worker import OllamaWorkerTranslate, FileTranslateWorker # MUST be the updated worker
 from base_page import BasePage 
 
 class TranslatorPage(BasePage):
@@ -69,11 +71,28 @@ class TranslatorPage(BasePage):
         self.translate_button.setFixedSize(200, 40)
         self.translate_button.setStyleSheet("background-color: #2ECC71; color: white; border-radius: 5px;")
         
+        # Large files are streamed from disk; the input box then only shows a preview
+        self.document = None
+        self.file_label = QLabel("")
+        self.file_label.setFont(QFont("Segoe UI", 9))
+        self.file_label.setStyleSheet("color: #7F8C8D;")
+        self.file_label.hide()
+        self.open_file_button = QPushButton("Open File...")
+        self.open_file_button.setFixedSize(120, 40)
+        self.clear_file_button = QPushButton("Clear File")
+        self.clear_file_button.setFixedSize(120, 40)
+        self.clear_file_button.hide()
+        
         h_layout = QHBoxLayout()
-        h_layout.addWidget(self.translate_button, alignment=Qt.AlignmentFlag.AlignCenter)
+        h_layout.addStretch()
+        h_layout.addWidget(self.open_file_button)
+        h_layout.addWidget(self.translate_button)
+        h_layout.addWidget(self.clear_file_button)
+        h_layout.addStretch()
 
         # Layout Assembly
         layout.addWidget(self.input_text)
+        layout.addWidget(self.file_label)
         layout.addLayout(lang_selection_layout)
         layout.addLayout(h_layout)
         layout.addWidget(self.output_text)
@@ -82,22 +101,103 @@ class TranslatorPage(BasePage):
 
         # --- LLM INTEGRATION ---
         self.translate_button.clicked.connect(self.run_translation)
+        self.open_file_button.clicked.connect(self.open_file)
+        self.clear_file_button.clicked.connect(self.clear_file)
         
         # Disable button if LLM is not ready
         if not self.llm_connector.is_model_ready:
             self.translate_button.setDisabled(True)
             self.output_text.setText("LLM is not ready. Check console for model pull status.")
 
+    def open_file(self):
+        """Selects a document to stream from disk and shows only its beginning."""
+        document = self.open_document()
+        if document is None:
+            return
+        try:
+            preview = document.preview()
+        except Exception as e:
+            QMessageBox.warning(self, "Cannot Read File", str(e))
+            return
+
+        self.document = document
+        self.input_text.setPlainText(preview)
+        self.input_text.setReadOnly(True)
+        self.file_label.setText(
+            f"File: {document.name} ({document.size_bytes / 2**20:.1f} MB) - "
+            f"preview of the first {len(preview):,} characters, the whole file will be translated."
+        )
+        self.file_label.show()
+        self.clear_file_button.show()
+
+    def clear_file(self):
+        """Returns to typing/pasting text."""
+        self.document = None
+        self.input_text.clear()
+        self.input_text.setReadOnly(False)
+        self.file_label.hide()
+        self.clear_file_button.hide()
+
+    def output_path_for(self, target_lang):
+        """
+        `<stem>.<lang>.txt` next to the source, numbered (`<stem>.<lang> (2).txt`, ...)
+        so an earlier translation or the source file itself is never overwritten.
+        """
+        stem, _ = os.path.splitext(self.document.path)
+        source = os.path.normcase(os.path.abspath(self.document.path))
+        candidate = f"{stem}.{target_lang.lower()}.txt"
+        number = 2
+        while os.path.exists(candidate) or os.path.normcase(os.path.abspath(candidate)) == source:
+            candidate = f"{stem}.{target_lang.lower()} ({number}).txt"
+            number += 1
+        return candidate
+
+    def run_file_translation(self, target_lang):
+        """Translates the opened file chunk by chunk into a new file next to it."""
+        output_path = self.output_path_for(target_lang)
+
+        self.begin_request(self.document.path)
+        self.output_text.setText(f"Translating {self.document.name} to {target_lang}...")
+        self.detection_label.setText("Language detected: *Detecting...*")
+        self.translate_button.setDisabled(True)
+
+        self.thread = FileTranslateWorker(
+            client=self.llm_connector.client,
+            model_name=self.llm_connector.model,
+            document=self.document,
+            target_lang=target_lang,
+            output_path=output_path,
+            chunk_chars=self.chunk_chars("translation"),
+            admission=self.llm_connector.admission,
+            **self.llm_connector.generation_kwargs("translation")
+        )
+
+        self.thread.language_detected.connect(self.display_detected_language)
+        self.thread.result_ready.connect(self.display_translation)
+        self.thread.result_ready.connect(
+            lambda text, document=self.document: self.record_history(
+                "translation", text, source=document.path, input_hash=document.content_hash or ""))
+        self.thread.progress_update.connect(self.output_text.setText)
+        self.thread.error_occurred.connect(self.handle_llm_error)
+        self.thread.finished.connect(self.thread_finished_cleanup)
+
+        self.thread.start()
+
     def run_translation(self):
         """Starts the non-blocking translation process (Detection + Translation)."""
         source_text = self.input_text.toPlainText().strip()
         # The worker handles source language detection internally
         target_lang = self.target_language_combo.currentText().split(' (')[0]
+
+        if self.document is not None:
+            self.run_file_translation(target_lang)
+            return
         
         if not source_text:
             self.output_text.setText("Please enter text to translate.")
             return
 
+        self.begin_request(source_text)
         self.output_text.setText(f"Detecting language, then translating to {target_lang}...")
         self.detection_label.setText("Language detected: *Detecting...*") # Set status immediately
         self.translate_button.setDisabled(True)
@@ -107,13 +207,17 @@ class TranslatorPage(BasePage):
             client=self.llm_connector.client,
             model_name=self.llm_connector.model,
             source_text=source_text, # Passed as source_text
-            target_lang=target_lang  # Passed as target_lang
+            target_lang=target_lang, # Passed as target_lang
+            admission=self.llm_connector.admission,
+            **self.llm_connector.generation_kwargs("translation")
         )
         
         self.thread.language_detected.connect(self.display_detected_language) 
         
         # Connect existing signals
         self.thread.result_ready.connect(self.display_translation)
+        self.thread.result_ready.connect(lambda text: self.record_history("translation", text))
+        self.thread.progress_update.connect(self.output_text.setText)
         self.thread.error_occurred.connect(self.handle_llm_error)
         self.thread.finished.connect(self.thread_finished_cleanup)
 
@@ -0,0 +1,90 @@
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout,
+    QLabel, QProgressBar, QPushButton
+)
+from PyQt6.QtGui import QFont
+
+from helper.ollama_worker import ProvisioningWorker
+
+
+class ProvisioningDialog(QDialog):
+    """Shows per-model and overall download progress while the standard models are pulled."""
+    def __init__(self, llm_connector, models, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Installing Models")
+        self.setMinimumWidth(520)
+        self.results = {}
+
+        layout = QVBoxLayout(self)
+        title = QLabel("Downloading models (interrupted downloads resume automatically)")
+        title.setFont(QFont("Segoe UI", 11, QFont.Weight.Bold))
+        layout.addWidget(title)
+
+        # One label + bar per model
+        self.bars = {}
+        self.labels = {}
+        for model in models:
+            label = QLabel(f"{model}: waiting")
+            bar = QProgressBar()
+            bar.setRange(0, 1000)
+            layout.addWidget(label)
+            layout.addWidget(bar)
+            self.labels[model] = label
+            self.bars[model] = bar
+
+        self.overall_label = QLabel("Overall")
+        self.overall_label.setFont(QFont("Segoe UI", 10, QFont.Weight.Bold))
+        self.overall_bar = QProgressBar()
+        self.overall_bar.setRange(0, 1000)
+        layout.addWidget(self.overall_label)
+        layout.addWidget(self.overall_bar)
+
+        self.close_button = QPushButton("Cancel")
+        self.close_button.clicked.connect(self.cancel_or_close)
+        h_layout = QHBoxLayout()
+        h_layout.addStretch()
+        h_layout.addWidget(self.close_button)
+        layout.addLayout(h_layout)
+
+        self.thread = ProvisioningWorker(llm_connector, models)
+        self.thread.progress_changed.connect(self.update_progress)
+        self.thread.provisioning_done.connect(self.provisioning_finished)
+        self.thread.error_occurred.connect(self.overall_label.setText)
+        self.thread.finished.connect(lambda: self.close_button.setText("Close"))
+        self.thread.start()
+
+    def update_progress(self, snapshot):
+        """Refreshes the bars from the worker's aggregated byte counters."""
+        completed_sum = 0
+        total_sum = 0
+        for model, (fraction, completed, total, status) in snapshot.items():
+            if model not in self.bars:
+                continue
+            self.bars[model].setValue(int(fraction * 1000))
+            size = f" ({completed / 2**30:.2f}/{total / 2**30:.2f} GiB)" if total else ""
+            self.labels[model].setText(f"{model}: {status}{size}")
+            completed_sum += completed
+            total_sum += total
+
+        if total_sum:
+            self.overall_bar.setValue(int(completed_sum * 1000 / total_sum))
+            self.overall_label.setText(f"Overall: {completed_sum / 2**30:.2f}/{total_sum / 2**30:.2f} GiB")
+
+    def provisioning_finished(self, results):
+        self.results = results
+        failed = [m for m, ok in results.items() if not ok]
+        self.overall_bar.setValue(1000 if not failed else self.overall_bar.value())
+        self.overall_label.setText("All models ready." if not failed else f"Failed: {', '.join(failed)}")
+
+    def cancel_or_close(self):
+        if self.thread.isRunning():
+            self.thread.cancel()
+            self.overall_label.setText("Cancelling... partial downloads are kept.")
+        else:
+            self.accept()
+
+    def closeEvent(self, event):
+        if self.thread.isRunning():
+            self.thread.cancel()
+            self.thread.wait(5000)
+        event.accept()
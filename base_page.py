@@ -1,13 +1,69 @@
+import time
 from PyQt6.QtWidgets import (
-    QWidget, QMessageBox
+    QWidget, QMessageBox, QFileDialog
 ) 
 
+from helper.document_source import DocumentSource, chunk_chars_for
+
 class BasePage(QWidget):
     """Base class to simplify page creation and LLM connector passing."""
     def __init__(self, llm_connector, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.llm_connector = llm_connector
         self.thread = None # To hold the worker thread
+        self.session = None # ChatSession kept alive for follow-up questions
+        self.rerun_without_cache = False # Set when the user declines a cached result
+        # Input and start time of the running request, recorded into the history store
+        self.history_input = ""
+        self.started_at = 0.0
+
+    def open_document(self):
+        """Asks for a text/PDF file and returns a DocumentSource (nothing is read yet), or None."""
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Open Document", "",
+            "Documents (*.txt *.md *.rst *.csv *.log *.srt *.vtt *.pdf);;All files (*)"
+        )
+        if not path:
+            return None
+        try:
+            return DocumentSource(path)
+        except OSError as e:
+            QMessageBox.warning(self, "Cannot Open File", str(e))
+            return None
+
+    def chunk_chars(self, task):
+        """Chunk size for streamed documents, derived from the tuned context size."""
+        options = self.llm_connector.generation_kwargs(task).get("options") or {}
+        return chunk_chars_for(options.get("num_ctx"), task)
+
+    def begin_request(self, input_text):
+        """Remembers what is being sent so the result can be recorded later."""
+        self.history_input = input_text
+        self.started_at = time.monotonic()
+
+    def record_history(self, task, output, source=None, input_hash=None):
+        """
+        Stores a finished result (with timings) in the persistent history.
+        For an opened file pass the hash of its streamed content (the recorded
+        input is only the path).
+        """
+        stats = self.session.last_stats if self.session is not None else None
+        # Admission control may have moved the job to a smaller model
+        model = getattr(self.thread, "model", None) or self.llm_connector.model
+        try:
+            self.llm_connector.history_store.add(
+                task=task,
+                model=model,
+                input_text=self.history_input,
+                output=output,
+                source=source,
+                duration_ms=int((time.monotonic() - self.started_at) * 1000),
+                stats=stats,
+                input_hash=input_hash
+            )
+        except Exception as e:
+            # History is a convenience; never let it break the result display
+            print(f"⚠️ Could not record history entry. Details: {e}")
 
     def handle_llm_error(self, error_message, title="Ollama LLM Error"):
         """Displays a modal box for LLM-related errors."""
@@ -19,4 +75,16 @@ class BasePage(QWidget):
         msg.setDetailedText(error_message)
         msg.exec()
         if self.thread:
-            self.thread = None
\ No newline at end of file
+            self.thread = None
+
+    def confirm_cached_result(self, similarity):
+        """Asks whether a previous result for a near-identical input should be reused."""
+        reply = QMessageBox.question(
+            self,
+            "Similar Input Found",
+            f"A previous result for a {similarity * 100:.1f}% similar input was found.\n\n"
+            "Reuse it instead of generating a new one?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.Yes
+        )
+        return reply == QMessageBox.StandardButton.Yes
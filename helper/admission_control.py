@@ -0,0 +1,322 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, List
+
+from helper.app_config import CHARS_PER_TOKEN, DEFAULT_NUM_CTX
+from helper.endpoint_pool import normalize_model_name
+from helper.service_health import ServiceUnavailableError
+
+# Conservative CPU-only throughput used until something has been measured
+FALLBACK_PROMPT_TPS = 40.0
+FALLBACK_GEN_TPS = 4.0
+# Expected output length per task, as a fixed count or a fraction of the input
+TASK_OUTPUT_TOKENS = {
+    "translation": lambda input_tokens: int(input_tokens * 1.2) + 16,
+    "text_summary": lambda input_tokens: 400,
+    "video_summary": lambda input_tokens: 400,
+}
+
+
+def read_memory() -> Optional[Dict[str, int]]:
+    """Returns {'total': bytes, 'available': bytes} of this machine, or None if unknown."""
+    try:
+        import psutil
+        vm = psutil.virtual_memory()
+        return {"total": vm.total, "available": vm.available}
+    except ImportError:
+        pass
+    try:
+        values = {}
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                key, value = line.split(":", 1)
+                values[key] = int(value.split()[0]) * 1024
+        return {"total": values["MemTotal"], "available": values["MemAvailable"]}
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def read_load() -> Optional[float]:
+    """1-minute load average per CPU (1.0 = all cores busy), or None where unsupported."""
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except (AttributeError, OSError):
+        return None
+
+
+class JobEstimate:
+    """Estimated cost of running one request on one model."""
+
+    def __init__(self, model: str, input_tokens: int, output_tokens: int,
+                 memory_bytes: int, seconds: float, model_loaded: bool):
+        self.model = model
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.memory_bytes = memory_bytes # Additional RAM needed; 0 if the model is already loaded
+        self.seconds = seconds
+        self.model_loaded = model_loaded
+
+    def __repr__(self):
+        return (f"<JobEstimate {self.model} in={self.input_tokens} out={self.output_tokens} "
+                f"mem={self.memory_bytes / 2**30:.2f}GiB t={self.seconds:.0f}s>")
+
+
+class AdmissionDecision:
+    """Outcome of AdmissionController.admit()."""
+    ACCEPT = "accept"
+    QUEUE = "queue"
+    DOWNGRADE = "downgrade"
+    REJECT = "reject"
+
+    def __init__(self, action: str, estimate: JobEstimate, message: str, eta_seconds: float = 0.0):
+        self.action = action
+        self.estimate = estimate
+        self.model = estimate.model
+        self.message = message
+        self.eta_seconds = eta_seconds
+
+
+class AdmissionError(Exception):
+    """Raised when a job is rejected or waited too long in the queue."""
+
+
+class AdmissionController:
+    """
+    Decides whether a job may run on the inference host now.
+
+    The estimate combines the model size (ollama list/show), whether it is
+    already loaded (ollama ps), the KV cache for the configured num_ctx, the
+    input token count and measured throughput (tuning profile, else the
+    running average of finished requests). It is compared with free RAM and
+    the system load, giving one of:
+      - accept    : run now
+      - queue     : wait for a running job / free memory / lower load
+      - downgrade : run on a smaller installed fallback model that fits now
+      - reject    : cannot fit on this machine, with the estimated run time
+
+    Memory and load are only known for a local Ollama (`local=True`); for
+    remote endpoints only the concurrency limit and time estimate apply.
+    """
+
+    MEMORY_HEADROOM = 1.15   # Runner overhead on top of weights + KV cache
+    MAX_LOAD_PER_CPU = 1.5   # Above this another heavy job would thrash the host
+    MAX_LOAD_WAIT_SECONDS = 60.0 # Load average lags; after this the job runs anyway
+    QUEUE_POLL_SECONDS = 2.0
+
+    def __init__(self, client, tuning_profiles=None, fallback_models: Optional[List[str]] = None,
+                 local: bool = True, max_concurrent_jobs: int = 1, max_queue_seconds: float = 600.0,
+                 monitor=None):
+        self.client = client
+        # HealthMonitor: while the service is down, jobs fail at once instead of queueing
+        self.monitor = monitor
+        self.tuning_profiles = tuning_profiles
+        self.fallback_models: List[str] = list(fallback_models or [])
+        self.local = local
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self.max_queue_seconds = max_queue_seconds
+
+        self._lock = threading.Lock()
+        self._slots = threading.Semaphore(max_concurrent_jobs)
+        self._running: Dict[int, float] = {}  # job id -> expected end (monotonic)
+        self._next_job_id = 0
+        self._model_info: Dict[str, Dict[str, Any]] = {}
+        self._throughput: Dict[str, Dict[str, float]] = {}
+
+    # --- Model facts ---
+    def _model_facts(self, model: str) -> Optional[Dict[str, Any]]:
+        """Weight size and KV-cache bytes per token, cached per model. None if not installed."""
+        if model in self._model_info:
+            return self._model_info[model]
+
+        size = None
+        wanted = normalize_model_name(model)
+        for m in self.client.list()['models']:
+            name = m.get('model') or m.get('name')
+            if name and normalize_model_name(name) == wanted:
+                size = int(m.get('size', 0) or 0)
+                break
+        if size is None:
+            return None
+
+        kv_per_token = 0
+        try:
+            show = self.client.show(model)
+            info = show.get('modelinfo') or show.get('model_info') or {}
+            arch = info.get('general.architecture', '')
+            layers = int(info.get(f'{arch}.block_count', 0) or 0)
+            embed = int(info.get(f'{arch}.embedding_length', 0) or 0)
+            heads = int(info.get(f'{arch}.attention.head_count', 0) or 0)
+            kv_heads = int(info.get(f'{arch}.attention.head_count_kv', heads) or heads)
+            if layers and embed and heads:
+                # K and V, f16 (2 bytes), per layer, per KV head
+                kv_per_token = 2 * layers * kv_heads * (embed // heads) * 2
+        except Exception as e:
+            print(f"⚠️ Could not read model details for '{model}', KV cache not estimated. Details: {e}")
+
+        facts = {"size": size, "kv_per_token": kv_per_token}
+        self._model_info[model] = facts
+        return facts
+
+    def _loaded_models(self) -> set:
+        """Names of the models currently in memory, normalized (':latest' added when untagged)."""
+        try:
+            return {normalize_model_name(m.get('model') or m.get('name'))
+                    for m in self.client.ps()['models'] if m.get('model') or m.get('name')}
+        except Exception:
+            return set()
+
+    def _rates(self, model: str, task: str):
+        """(prompt tok/s, generation tok/s): measured average, then tuning profile, then fallback."""
+        measured = self._throughput.get(model)
+        if measured:
+            return measured["prompt_tps"], measured["gen_tps"]
+        profile = self.tuning_profiles.get(model, task) if self.tuning_profiles else None
+        if profile and profile.get("metrics"):
+            return profile["metrics"]["prompt_tps"], profile["metrics"]["gen_tps"]
+        return FALLBACK_PROMPT_TPS, FALLBACK_GEN_TPS
+
+    def record(self, model: str, stats: Dict[str, Any]):
+        """Feeds a finished request's ChatSession stats into the throughput average."""
+        if not stats or not stats.get("prompt_eval_duration") or not stats.get("eval_duration"):
+            return
+        prompt_tps = stats["prompt_eval_count"] / (stats["prompt_eval_duration"] / 1e9)
+        gen_tps = stats["eval_count"] / (stats["eval_duration"] / 1e9)
+        with self._lock:
+            old = self._throughput.get(model)
+            if old:
+                # Exponential moving average; cached prefixes make single samples noisy
+                prompt_tps = 0.7 * old["prompt_tps"] + 0.3 * prompt_tps
+                gen_tps = 0.7 * old["gen_tps"] + 0.3 * gen_tps
+            self._throughput[model] = {"prompt_tps": prompt_tps, "gen_tps": gen_tps}
+
+    # --- Estimation / decision ---
+    def estimate(self, model: str, task: str, text: str,
+                 options: Optional[Dict[str, Any]] = None) -> Optional[JobEstimate]:
+        facts = self._model_facts(model)
+        if facts is None:
+            return None
+
+        input_tokens = max(1, len(text) // CHARS_PER_TOKEN)
+        output_tokens = TASK_OUTPUT_TOKENS.get(task, lambda n: 400)(input_tokens)
+        num_ctx = (options or {}).get("num_ctx", DEFAULT_NUM_CTX)
+
+        loaded = normalize_model_name(model) in self._loaded_models()
+        memory = 0 if loaded else int((facts["size"] + facts["kv_per_token"] * num_ctx) * self.MEMORY_HEADROOM)
+
+        prompt_tps, gen_tps = self._rates(model, task)
+        # Ollama truncates the prompt to num_ctx, so that bounds the evaluated tokens
+        seconds = min(input_tokens, num_ctx) / prompt_tps + output_tokens / gen_tps
+        return JobEstimate(model, input_tokens, output_tokens, memory, seconds, loaded)
+
+    def _queue_eta(self) -> float:
+        now = time.monotonic()
+        with self._lock:
+            return sum(max(0.0, end - now) for end in self._running.values())
+
+    def _fits_now(self, estimate: JobEstimate, memory: Optional[Dict[str, int]]) -> bool:
+        return memory is None or estimate.memory_bytes <= memory["available"]
+
+    def _check_available(self):
+        # A failed ps() reads as "nothing loaded" and would queue the job for memory
+        if self.monitor is not None and self.monitor.is_down:
+            raise ServiceUnavailableError(self.monitor.detail or "Ollama service is down.")
+
+    def is_loaded(self, model: str) -> bool:
+        """True if `model` is currently in memory (its prompt cache may still be warm)."""
+        return normalize_model_name(model) in self._loaded_models()
+
+    def admit(self, model: str, task: str, text: str,
+              options: Optional[Dict[str, Any]] = None, allow_downgrade: bool = True) -> AdmissionDecision:
+        """
+        Estimates the job and decides what to do with it (see class docstring).
+        allow_downgrade=False never switches to a fallback model (the job is
+        queued or rejected instead), e.g. for a conversation bound to its model.
+        """
+        self._check_available()
+        estimate = self.estimate(model, task, text, options)
+        if estimate is None:
+            # Model not installed here; let the request fail with Ollama's own error
+            return AdmissionDecision(AdmissionDecision.ACCEPT,
+                                     JobEstimate(model, 0, 0, 0, 0.0, False), "Model not measured.")
+
+        memory = read_memory() if self.local else None
+        load = read_load() if self.local else None
+
+        if memory is not None and estimate.memory_bytes > memory["total"] * 0.9:
+            # Would swap even on an idle machine
+            return self._downgrade_or(AdmissionDecision.REJECT, estimate, task, text, options, memory,
+                f"'{model}' needs ~{estimate.memory_bytes / 2**30:.1f} GiB but this machine has "
+                f"{memory['total'] / 2**30:.1f} GiB. The job would take ~{estimate.seconds / 60:.0f} min.",
+                allow_downgrade)
+
+        if not self._fits_now(estimate, memory):
+            return self._downgrade_or(AdmissionDecision.QUEUE, estimate, task, text, options, memory,
+                f"Waiting for memory: need ~{estimate.memory_bytes / 2**30:.1f} GiB, "
+                f"{memory['available'] / 2**30:.1f} GiB free.",
+                allow_downgrade)
+
+        eta = self._queue_eta()
+        if eta > 0 or (load is not None and load > self.MAX_LOAD_PER_CPU):
+            reason = "another job is running" if eta > 0 else f"host is busy (load {load:.1f}/CPU)"
+            return AdmissionDecision(AdmissionDecision.QUEUE, estimate,
+                f"Queued: {reason}. Starting in ~{eta:.0f}s, then ~{estimate.seconds:.0f}s to run.", eta)
+
+        return AdmissionDecision(AdmissionDecision.ACCEPT, estimate,
+                                 f"Estimated ~{estimate.seconds:.0f}s for ~{estimate.input_tokens} input tokens.")
+
+    def _downgrade_or(self, fallback_action, estimate, task, text, options, memory, message,
+                      allow_downgrade: bool = True):
+        """Tries the configured smaller models before queueing/rejecting."""
+        for candidate in (self.fallback_models if allow_downgrade else []):
+            if candidate == estimate.model:
+                continue
+            smaller = self.estimate(candidate, task, text, options)
+            if smaller is None:
+                continue
+            if self._fits_now(smaller, memory):
+                return AdmissionDecision(AdmissionDecision.DOWNGRADE, smaller,
+                    f"{message} Using smaller model '{candidate}' instead (~{smaller.seconds:.0f}s).")
+        return AdmissionDecision(fallback_action, estimate, message, estimate.seconds)
+
+    @contextmanager
+    def run(self, decision: AdmissionDecision, cancelled=lambda: False):
+        """
+        Holds a job slot while the request runs. For queued decisions this
+        blocks until a slot and enough memory are free, or raises AdmissionError
+        after max_queue_seconds (or when `cancelled()` becomes true), and
+        ServiceUnavailableError as soon as the service is reported down.
+        """
+        if decision.action == AdmissionDecision.REJECT:
+            raise AdmissionError(decision.message)
+
+        deadline = time.monotonic() + self.max_queue_seconds
+        load_deadline = time.monotonic() + self.MAX_LOAD_WAIT_SECONDS
+        while True:
+            if cancelled():
+                raise AdmissionError("Job cancelled while queued.")
+            self._check_available()
+            if self._slots.acquire(timeout=self.QUEUE_POLL_SECONDS):
+                memory = read_memory() if self.local else None
+                load = read_load() if self.local else None
+                busy = (load is not None and load > self.MAX_LOAD_PER_CPU
+                        and time.monotonic() < load_deadline)
+                if self._fits_now(decision.estimate, memory) and not busy:
+                    break
+                self._slots.release()
+                time.sleep(self.QUEUE_POLL_SECONDS)
+            if time.monotonic() > deadline:
+                raise AdmissionError(
+                    f"Gave up after waiting {self.max_queue_seconds / 60:.0f} min for resources. {decision.message}")
+
+        with self._lock:
+            job_id = self._next_job_id
+            self._next_job_id += 1
+            self._running[job_id] = time.monotonic() + decision.estimate.seconds
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._running.pop(job_id, None)
+            self._slots.release()
@@ -0,0 +1,10 @@
+# Paths and estimates shared by the helpers; import them from here instead of redefining them
+import os
+
+# Root folder for everything the app persists on disk
+APP_DATA_DIR = os.path.join(os.path.expanduser("~"), ".ai_desktop_helper")
+
+# Ollama's context window when no num_ctx option is given
+DEFAULT_NUM_CTX = 4096
+# Roughly 4 characters per token, used before the server has reported counts
+CHARS_PER_TOKEN = 4
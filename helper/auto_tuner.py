@@ -0,0 +1,250 @@
+"""
+Host-specific tuning of Ollama generation options.
+
+Runs a short, fixed benchmark for each task against the configured model over
+a grid of num_thread / num_batch, measures prompt-eval and generation
+tokens/sec plus the loaded model size, and stores the best profile per model
+and task. LocalLLMConnector applies the stored profile automatically.
+
+num_ctx is not tuned: it decides how much input fits, not only speed, and a
+different value per task would force Ollama to reload the model whenever the
+user switches tasks. Every task of a model gets the same num_ctx, large enough
+for the most demanding task (see model_num_ctx).
+
+Usage (from the project root):
+    python -m helper.auto_tuner --model ibm/granite3.2:8b
+    python -m helper.auto_tuner --model mistral-small --task text_summary --quick
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+import itertools
+from typing import Optional, Dict, Any, List
+
+from helper.app_config import APP_DATA_DIR
+from helper.endpoint_pool import normalize_model_name
+
+# Fixed workloads: how many prompt tokens to send and tokens to generate, and
+# the minimum context a real request of this task needs. The score of a
+# configuration is the estimated wall time of this workload.
+TASK_WORKLOADS: Dict[str, Dict[str, int]] = {
+    "translation":   {"prompt_tokens": 400,  "gen_tokens": 256, "min_ctx": 2048},
+    "text_summary":  {"prompt_tokens": 2000, "gen_tokens": 128, "min_ctx": 4096},
+    "video_summary": {"prompt_tokens": 2000, "gen_tokens": 128, "min_ctx": 8192},
+}
+
+
+def model_num_ctx() -> int:
+    """The one num_ctx used for every task of a model: the largest task minimum."""
+    return max(w["min_ctx"] for w in TASK_WORKLOADS.values())
+
+
+# keep_alive does not change tokens/sec, it only avoids reloading the model
+# between requests. Tuned profiles keep the model loaded for this long.
+DEFAULT_KEEP_ALIVE = "30m"
+
+BENCH_PARAGRAPH = (
+    "The committee reviewed the quarterly report on regional water usage. Farmers in the "
+    "northern valley reduced consumption by adopting drip irrigation, while the city expanded "
+    "its reservoir to cope with population growth. Several members raised concerns about the "
+    "cost of maintenance and asked for an independent audit before approving next year's budget. "
+)
+
+
+def _cpu_grid() -> List[int]:
+    """Thread counts worth trying: physical cores, logical cores and half of the physical ones."""
+    logical = os.cpu_count() or 4
+    physical = logical
+    try:
+        import psutil
+        physical = psutil.cpu_count(logical=False) or logical
+    except ImportError:
+        pass
+    return sorted({max(1, physical // 2), physical, logical})
+
+
+def default_grid(quick: bool = False) -> Dict[str, List[int]]:
+    if quick:
+        return {"num_thread": [max(_cpu_grid())], "num_batch": [256, 512]}
+    return {"num_thread": _cpu_grid(), "num_batch": [128, 256, 512]}
+
+
+class TuningProfiles:
+    """JSON file of the best options per model and task."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path: str = path or os.path.join(APP_DATA_DIR, "tuning_profiles.json")
+        self.profiles: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.profiles = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Could not read tuning profiles, using Ollama defaults. Details: {e}")
+
+    def get(self, model: str, task: str) -> Optional[Dict[str, Any]]:
+        return self.profiles.get(model, {}).get(task)
+
+    def set(self, model: str, task: str, profile: Dict[str, Any]):
+        self.profiles.setdefault(model, {})[task] = profile
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.profiles, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+class InferenceTuner:
+    """Benchmarks option combinations for one model and picks the fastest per task."""
+
+    def __init__(self, client, model_name: str, num_ctx: Optional[int] = None):
+        self.client = client
+        self.model: str = model_name
+        # Fixed for all tasks and grid points (see module docstring)
+        self.num_ctx: int = num_ctx or model_num_ctx()
+
+    def _bench_prompt(self, prompt_tokens: int) -> str:
+        # ~4 characters per token; a unique prefix defeats Ollama's prompt cache
+        # so every run measures a full prompt evaluation.
+        repeats = max(1, (prompt_tokens * 4) // len(BENCH_PARAGRAPH))
+        return f"[run {uuid.uuid4().hex}]\n" + BENCH_PARAGRAPH * repeats
+
+    def _loaded_size(self) -> int:
+        """Bytes used by the loaded model (weights + KV cache) as reported by ollama ps."""
+        wanted = normalize_model_name(self.model)
+        try:
+            for m in self.client.ps()['models']:
+                name = m.get('model') or m.get('name')
+                if name and normalize_model_name(name) == wanted:
+                    return int(m.get('size', 0) or 0)
+        except Exception:
+            pass
+        return 0
+
+    def run_one(self, workload: Dict[str, int], options: Dict[str, int]) -> Dict[str, Any]:
+        """Measures one configuration. Raises on failure (e.g. out of memory)."""
+        options = {**options, "temperature": 0, "seed": 0, "num_predict": workload["gen_tokens"]}
+
+        # Warm-up: loads the model with these options so load time is not measured
+        self.client.chat(model=self.model, messages=[{"role": "user", "content": "Hi"}],
+                         options={**options, "num_predict": 1}, keep_alive="5m")
+
+        messages = [
+            {"role": "system", "content": "Summarize the user's text in detail."},
+            {"role": "user", "content": self._bench_prompt(workload["prompt_tokens"])},
+        ]
+        response = self.client.chat(model=self.model, messages=messages, options=options, keep_alive="5m")
+
+        prompt_count = int(response.get('prompt_eval_count', 0) or 0)
+        prompt_ns = int(response.get('prompt_eval_duration', 0) or 0)
+        eval_count = int(response.get('eval_count', 0) or 0)
+        eval_ns = int(response.get('eval_duration', 0) or 0)
+
+        prompt_tps = prompt_count / (prompt_ns / 1e9) if prompt_ns else 0.0
+        gen_tps = eval_count / (eval_ns / 1e9) if eval_ns else 0.0
+        if prompt_tps <= 0 or gen_tps <= 0:
+            raise RuntimeError("Benchmark response did not contain timing data.")
+
+        # Estimated wall time of the task's workload with this configuration
+        est_seconds = workload["prompt_tokens"] / prompt_tps + workload["gen_tokens"] / gen_tps
+        return {
+            "prompt_tps": round(prompt_tps, 2),
+            "gen_tps": round(gen_tps, 2),
+            "memory_bytes": self._loaded_size(),
+            "est_seconds": round(est_seconds, 3),
+        }
+
+    def tune(self, tasks: List[str], grid: Dict[str, List[int]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Benchmarks every grid point once per distinct workload and returns the
+        best profile per task. Tasks with the same workload (text and video
+        summary) share the measurements. Failing configurations are skipped.
+        """
+        keys = list(grid.keys())
+        combos = [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+        results: Dict[str, Dict[str, Any]] = {}
+        # (prompt_tokens, gen_tokens, options) -> metrics, or None if the run failed
+        measured: Dict[tuple, Optional[Dict[str, Any]]] = {}
+
+        for task in tasks:
+            workload = TASK_WORKLOADS[task]
+            if self.num_ctx < workload["min_ctx"]:
+                print(f"⚠️ num_ctx={self.num_ctx} is below the {workload['min_ctx']} tokens '{task}' needs; "
+                      "long inputs will be truncated.")
+            candidates = [{**c, "num_ctx": self.num_ctx} for c in combos]
+
+            print(f"\n=== Tuning '{task}' on {self.model} ({len(candidates)} configurations, num_ctx={self.num_ctx}) ===")
+            best = None
+            for options in candidates:
+                label = ", ".join(f"{k}={v}" for k, v in options.items())
+                key = (workload["prompt_tokens"], workload["gen_tokens"], tuple(sorted(options.items())))
+                if key in measured:
+                    metrics = measured[key]
+                    if metrics is None:
+                        continue
+                    print(f"  {label}: same workload already measured (~{metrics['est_seconds']:.1f}s)")
+                else:
+                    try:
+                        start = time.monotonic()
+                        metrics = measured[key] = self.run_one(workload, options)
+                        print(f"  {label}: prompt {metrics['prompt_tps']:.1f} tok/s, "
+                              f"gen {metrics['gen_tps']:.1f} tok/s, "
+                              f"mem {metrics['memory_bytes'] / 2**30:.2f} GiB "
+                              f"({time.monotonic() - start:.1f}s)")
+                    except Exception as e:
+                        measured[key] = None
+                        print(f"  {label}: failed ({e})")
+                        continue
+
+                # Fastest wins; on a tie (within 2%) prefer the smaller memory footprint
+                if (best is None
+                        or metrics["est_seconds"] < best["metrics"]["est_seconds"] * 0.98
+                        or (metrics["est_seconds"] <= best["metrics"]["est_seconds"] * 1.02
+                            and metrics["memory_bytes"] < best["metrics"]["memory_bytes"])):
+                    best = {"options": options, "keep_alive": DEFAULT_KEEP_ALIVE, "metrics": metrics}
+
+            if best:
+                best["tuned_at"] = time.time()
+                results[task] = best
+                print(f"✅ Best for '{task}': {best['options']} (~{best['metrics']['est_seconds']:.1f}s per request)")
+            else:
+                print(f"🛑 Every configuration failed for '{task}'.")
+
+        return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark Ollama options and store the best profile per task.")
+    parser.add_argument("--model", default="ibm/granite3.2:8b", help="Model to tune.")
+    parser.add_argument("--task", action="append", choices=sorted(TASK_WORKLOADS),
+                        help="Task to tune (repeatable). Default: all tasks.")
+    parser.add_argument("--host", default=None, help="Ollama host (default: OLLAMA_HOST or localhost).")
+    parser.add_argument("--quick", action="store_true", help="Smaller grid for a fast first profile.")
+    parser.add_argument("--num-ctx", type=int, default=None,
+                        help=f"Context size used for every task (default: {model_num_ctx()}).")
+    args = parser.parse_args(argv)
+
+    import ollama
+    client = ollama.Client(host=args.host)
+
+    tuner = InferenceTuner(client, args.model, num_ctx=args.num_ctx)
+    results = tuner.tune(args.task or list(TASK_WORKLOADS), default_grid(args.quick))
+    if not results:
+        return 1
+
+    profiles = TuningProfiles()
+    for task, profile in results.items():
+        profiles.set(args.model, task, profile)
+    profiles.save()
+    print(f"\nSaved tuning profiles to {profiles.path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+from typing import Optional, Dict, Any, List
+
+from helper.app_config import CHARS_PER_TOKEN, DEFAULT_NUM_CTX
+
+# Tokens kept free for the model's answer to a follow-up
+ANSWER_RESERVE_TOKENS = 512
+
+
+class SessionFullError(Exception):
+    """Raised when the source text alone leaves no room for another question."""
+
+
+class ChatSession:
+    """
+    Keeps a conversation with the local Ollama model alive across requests.
+
+    Ollama caches the evaluated prompt (KV cache) of the last request for a
+    loaded model. As long as the model stays loaded (keep_alive) and the next
+    request starts with the exact same messages, only the new tail has to be
+    evaluated. This class therefore never rewrites earlier messages; follow-up
+    questions are appended to the history so the system prompt and source
+    text are reused instead of being re-evaluated.
+
+    The history is kept within num_ctx: when the next question would not fit,
+    the oldest follow-up exchanges are dropped (the system prompt and the first
+    exchange holding the source text always stay, so their prefix is still
+    reused). Otherwise Ollama would silently cut the oldest messages, i.e. the
+    document itself.
+    """
+
+    def __init__(self, client, model_name: str, system_prompt: Optional[str] = None,
+                 keep_alive: Optional[str] = None, options: Optional[Dict[str, Any]] = None):
+        # A pooled client is pinned to one endpoint, where the prefix is cached
+        self.client = client.session_client() if hasattr(client, "session_client") else client
+        self.model: str = model_name
+        self.keep_alive: str = keep_alive or "30m"
+        # Generation options (num_thread, num_ctx, ...) from the tuning profile
+        self.options: Optional[Dict[str, Any]] = options
+        self.messages: List[Dict[str, str]] = []
+        # Telemetry of the most recent call (see _extract_stats)
+        self.last_stats: Dict[str, Any] = {}
+        # Tokens in the history as counted by the server after the last call
+        self.context_tokens: int = 0
+
+        if system_prompt:
+            self.messages.append({"role": "system", "content": system_prompt})
+
+    @property
+    def has_history(self) -> bool:
+        """True once at least one exchange has been completed."""
+        return any(m["role"] == "assistant" for m in self.messages)
+
+    @property
+    def num_ctx(self) -> int:
+        return int((self.options or {}).get("num_ctx") or DEFAULT_NUM_CTX)
+
+    @staticmethod
+    def _estimate_tokens(messages: List[Dict[str, str]]) -> int:
+        return sum(len(m["content"]) for m in messages) // CHARS_PER_TOKEN + 4 * len(messages)
+
+    def _history_tokens(self) -> int:
+        # prompt_eval_count may only cover the uncached tail, so never trust it below the estimate
+        return max(self.context_tokens, self._estimate_tokens(self.messages))
+
+    def _pinned_count(self) -> int:
+        """Number of leading messages that are never trimmed: system prompt(s) and the first exchange."""
+        for index, message in enumerate(self.messages):
+            if message["role"] == "assistant":
+                return index + 1
+        return len(self.messages)
+
+    def _fit_history(self, content: str):
+        """Drops the oldest follow-up exchanges until `content` and an answer fit in num_ctx."""
+        needed = self._estimate_tokens([{"role": "user", "content": content}]) + ANSWER_RESERVE_TOKENS
+        pinned = self._pinned_count()
+        trimmed = False
+        while self._history_tokens() + needed > self.num_ctx and len(self.messages) > pinned:
+            # Remove one exchange: the user turn and everything up to the next user turn
+            end = pinned + 1
+            while end < len(self.messages) and self.messages[end]["role"] != "user":
+                end += 1
+            self.messages = self.messages[:pinned] + self.messages[end:]
+            self.context_tokens = 0 # Server count no longer matches; fall back to the estimate
+            trimmed = True
+
+        if self._history_tokens() + needed > self.num_ctx:
+            raise SessionFullError(
+                f"The conversation is full ({self._history_tokens()} of {self.num_ctx} context tokens used "
+                "by the source text). Start a new summary to ask more questions.")
+        if trimmed:
+            print(f"ℹ️ Dropped older follow-up questions to stay within num_ctx={self.num_ctx}.")
+
+    def ask(self, content: str) -> str:
+        """
+        Sends a user message on top of the existing history and returns the reply.
+        The message is only kept in the history if the call succeeds, so a failed
+        request does not break the shared prefix for the next one.
+        Raises SessionFullError if a follow-up cannot fit in the context window.
+        """
+        if self.has_history:
+            self._fit_history(content)
+        messages = self.messages + [{"role": "user", "content": content}]
+        response = self.client.chat(
+            model=self.model,
+            messages=messages,
+            keep_alive=self.keep_alive,
+            options=self.options
+        )
+        reply = response['message']['content'].strip()
+
+        messages.append({"role": "assistant", "content": reply})
+        self.messages = messages
+        self.last_stats = self._extract_stats(response)
+        self.context_tokens = self.last_stats["prompt_eval_count"] + self.last_stats["eval_count"]
+        return reply
+
+    def reset(self):
+        """Drops everything except the system prompt."""
+        self.messages = [m for m in self.messages if m["role"] == "system"]
+        self.last_stats = {}
+        self.context_tokens = 0
+
+    @staticmethod
+    def _extract_stats(response) -> Dict[str, Any]:
+        """Pulls the timing counters Ollama returns with every non-streamed response."""
+        stats = {}
+        for key in ("prompt_eval_count", "prompt_eval_duration",
+                    "eval_count", "eval_duration", "load_duration", "total_duration"):
+            # Durations are reported in nanoseconds; missing values become 0
+            stats[key] = int(response.get(key, 0) or 0)
+        return stats
+
+
+def format_stats(stats: Dict[str, Any]) -> str:
+    """Formats ChatSession.last_stats into a one-line telemetry string for the UI."""
+    if not stats:
+        return ""
+
+    prompt_ms = stats.get("prompt_eval_duration", 0) / 1e6
+    eval_ms = stats.get("eval_duration", 0) / 1e6
+    total_s = stats.get("total_duration", 0) / 1e9
+    eval_count = stats.get("eval_count", 0)
+    tokens_per_sec = eval_count / (eval_ms / 1000) if eval_ms > 0 else 0.0
+
+    return (
+        f"Prompt eval: {stats.get('prompt_eval_count', 0)} tokens in {prompt_ms:.0f} ms | "
+        f"Generation: {eval_count} tokens ({tokens_per_sec:.1f} tok/s) | "
+        f"Total: {total_s:.1f} s"
+    )
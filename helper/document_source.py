@@ -0,0 +1,127 @@
+import os
+import hashlib
+from typing import Iterator, Optional
+
+from helper.app_config import CHARS_PER_TOKEN, DEFAULT_NUM_CTX
+
+# Extensions read as plain text; anything else that is not a PDF is tried as UTF-8 text too
+TEXT_EXTENSIONS = {".txt", ".md", ".rst", ".csv", ".log", ".srt", ".vtt", ".html", ".json"}
+READ_BLOCK_CHARS = 64 * 1024
+# Tokens left for the system prompt and the answer
+RESERVED_TOKENS = 1024
+# Output tokens per input token for tasks whose answer grows with the input;
+# a summary's answer is short and fits in RESERVED_TOKENS.
+TASK_OUTPUT_RATIO = {"translation": 1.2}
+
+
+def chunk_chars_for(num_ctx: Optional[int], task: Optional[str] = None) -> int:
+    """
+    Chunk size in characters that fits the model's context window. For a
+    translation the output is about as long as the input and shares the same
+    window, so input plus expected output have to fit.
+    """
+    num_ctx = num_ctx or DEFAULT_NUM_CTX
+    input_tokens = (num_ctx - RESERVED_TOKENS) / (1.0 + TASK_OUTPUT_RATIO.get(task, 0.0))
+    return max(1000, int(input_tokens * CHARS_PER_TOKEN * 0.8))
+
+
+class DocumentSource:
+    """
+    A text or PDF file read from disk on demand.
+
+    Nothing is loaded up front: preview() reads only the beginning and
+    iter_chunks() streams the document in context-sized pieces, so memory use
+    does not grow with the document size. Text files are decoded incrementally
+    in blocks; PDFs are extracted one page at a time (needs `pypdf`).
+
+    After iter_chunks() has run to the end, content_hash holds the SHA-256 of
+    the whole text (same as hashing it as one string), so the history can
+    recognize the document without keeping it.
+    """
+
+    def __init__(self, path: str):
+        self.path: str = path
+        self.name: str = os.path.basename(path)
+        self.size_bytes: int = os.path.getsize(path)
+        self.is_pdf: bool = os.path.splitext(path)[1].lower() == ".pdf"
+        self.content_hash: Optional[str] = None
+
+    # --- Raw text streams ---
+    def _iter_text_blocks(self) -> Iterator[str]:
+        if self.is_pdf:
+            yield from self._iter_pdf_pages()
+            return
+        # errors="replace" so a stray invalid byte does not abort a multi-MB file
+        with open(self.path, "r", encoding="utf-8", errors="replace") as f:
+            while True:
+                block = f.read(READ_BLOCK_CHARS)
+                if not block:
+                    break
+                yield block
+
+    def _iter_pdf_pages(self) -> Iterator[str]:
+        try:
+            from pypdf import PdfReader
+        except ImportError:
+            raise RuntimeError("Reading PDF files requires the 'pypdf' package (pip install pypdf).")
+
+        # pypdf reads pages from the handle on demand; the with block closes it
+        # when iteration ends, also when the caller stops early
+        with open(self.path, "rb") as f:
+            reader = PdfReader(f)
+            for page in reader.pages:
+                text = page.extract_text() or ""
+                if text:
+                    yield text + "\n\n"
+
+    # --- Public API ---
+    def preview(self, max_chars: int = 4000) -> str:
+        """The first `max_chars` characters, for display only."""
+        parts = []
+        remaining = max_chars
+        for block in self._iter_text_blocks():
+            parts.append(block[:remaining])
+            remaining -= len(parts[-1])
+            if remaining <= 0:
+                break
+        return "".join(parts)
+
+    def iter_chunks(self, chunk_chars: int) -> Iterator[str]:
+        """
+        Yields chunks of at most ~chunk_chars characters, cut at paragraph or
+        sentence boundaries where possible. Only one chunk plus one read block
+        is held in memory at a time.
+        """
+        self.content_hash = None
+        digest = hashlib.sha256()
+        buffer = ""
+        for block in self._iter_text_blocks():
+            digest.update(block.encode("utf-8"))
+            buffer += block
+            while len(buffer) >= chunk_chars:
+                cut = self._find_cut(buffer, chunk_chars)
+                chunk = buffer[:cut].strip()
+                buffer = buffer[cut:]
+                if chunk:
+                    yield chunk
+        tail = buffer.strip()
+        if tail:
+            yield tail
+        self.content_hash = digest.hexdigest()
+
+    @staticmethod
+    def _find_cut(text: str, limit: int) -> int:
+        """Prefers a paragraph break, then a sentence end, then any whitespace in the last third."""
+        window_start = limit * 2 // 3
+        for separator in ("\n\n", ". ", "\n", " "):
+            position = text.rfind(separator, window_start, limit)
+            if position != -1:
+                return position + len(separator)
+        return limit
+
+    def estimated_chunks(self, chunk_chars: int) -> int:
+        """Rough number of chunks, for progress reporting (bytes ~ characters for text)."""
+        if self.is_pdf:
+            # Extracted PDF text is much smaller than the file; assume ~10%
+            return max(1, int(self.size_bytes * 0.1) // chunk_chars + 1)
+        return max(1, self.size_bytes // chunk_chars + 1)
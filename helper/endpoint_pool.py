@@ -0,0 +1,309 @@
+import time
+import random
+import threading
+from typing import Optional, Dict, Any, List, Iterator
+
+import httpx
+import ollama
+
+
+def normalize_model_name(name: str) -> str:
+    """Ollama reports untagged models as ':latest'; compare names in that form."""
+    return name if ":" in name.split("/")[-1] else f"{name}:latest"
+
+
+def streamed_chat(client, **kwargs):
+    """
+    Runs client.chat as a stream and returns the usual complete response (the
+    final chunk with the whole message content and the timing counters).
+    Streaming makes the client's read timeout apply between chunks instead of
+    to the whole answer, so a wedged server is detected without cutting off a
+    slow CPU generation.
+    """
+    if kwargs.get("stream"):
+        return client.chat(**kwargs)
+    kwargs["stream"] = True
+    parts = []
+    final = None
+    for chunk in client.chat(**kwargs):
+        parts.append(chunk['message']['content'] or "")
+        final = chunk
+    if final is None:
+        raise ConnectionError("Ollama closed the chat stream without a response.")
+    final['message']['content'] = "".join(parts)
+    return final
+
+
+class OllamaEndpoint:
+    """State of a single Ollama server in the pool."""
+
+    def __init__(self, host: str, timeout: Optional[float] = None, probe_timeout: Optional[float] = None):
+        self.host: str = host
+        # Streamed calls (chat, pull); the timeout applies between chunks
+        self.client: ollama.Client = ollama.Client(host=host, timeout=timeout)
+        # Health checks and quick calls (show, embed, ps) use a short read timeout
+        # so a hung server cannot block them
+        self.probe_client: ollama.Client = (ollama.Client(host=host, timeout=probe_timeout)
+                                            if probe_timeout is not None else self.client)
+        self.outstanding: int = 0          # Requests currently in flight
+        self.models: Optional[set] = None  # None until the first successful health check
+        self.healthy: bool = True
+        self.failures: int = 0             # Consecutive failures, drives the ejection backoff
+        self.ejected_until: float = 0.0
+
+    def has_model(self, model: str) -> bool:
+        # Unknown model list (not probed yet) is treated as "maybe", the call will tell
+        return self.models is None or normalize_model_name(model) in self.models
+
+    def __repr__(self):
+        state = "up" if self.healthy else "ejected"
+        return f"<OllamaEndpoint {self.host} {state} outstanding={self.outstanding}>"
+
+
+class EndpointPool:
+    """
+    Spreads Ollama calls over several servers.
+
+    Exposes the subset of the ollama.Client interface the app uses (chat,
+    embed, show, pull, list, ps), so workers and the connector can use a pool
+    wherever they used a single client. Each call is routed to the healthy
+    endpoint with the fewest outstanding requests that has the model. Endpoints
+    that fail with connection errors are ejected with exponential backoff and
+    readmitted once a health check (list()) succeeds again.
+    """
+
+    BASE_EJECT_SECONDS = 2.0
+    MAX_EJECT_SECONDS = 60.0
+
+    def __init__(self, hosts: List[str], timeout: Optional[float] = None, probe_timeout: Optional[float] = None):
+        if not hosts:
+            raise ValueError("EndpointPool needs at least one host.")
+        self.endpoints: List[OllamaEndpoint] = [OllamaEndpoint(h, timeout, probe_timeout) for h in hosts]
+        self._lock = threading.Lock()
+        self._health_thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    # --- Health ---
+    def check_endpoint(self, endpoint: OllamaEndpoint) -> bool:
+        """Probes one endpoint with list() and refreshes its model set."""
+        try:
+            response = endpoint.probe_client.list()
+            models = set()
+            for m in response['models']:
+                name = m.get('model') or m.get('name')
+                if name:
+                    models.add(normalize_model_name(name))
+            with self._lock:
+                endpoint.models = models
+                self._mark_success(endpoint)
+            return True
+        except Exception as e:
+            with self._lock:
+                self._mark_failure(endpoint, e)
+            return False
+
+    def check_all(self):
+        """Probes every endpoint once (used at startup and by the health thread)."""
+        for endpoint in self.endpoints:
+            self.check_endpoint(endpoint)
+
+    def start_health_checks(self, interval: float = 10.0):
+        """Starts a daemon thread that probes endpoints and readmits recovered ones."""
+        if self._health_thread and self._health_thread.is_alive():
+            return
+        self._stop_event.clear()
+
+        def loop():
+            while not self._stop_event.wait(interval):
+                now = time.monotonic()
+                for endpoint in self.endpoints:
+                    # Ejected endpoints are only probed once their backoff expired
+                    if endpoint.healthy or now >= endpoint.ejected_until:
+                        self.check_endpoint(endpoint)
+
+        self._health_thread = threading.Thread(target=loop, name="ollama-pool-health", daemon=True)
+        self._health_thread.start()
+
+    def stop_health_checks(self):
+        self._stop_event.set()
+
+    def _mark_success(self, endpoint: OllamaEndpoint):
+        if not endpoint.healthy:
+            print(f"✅ Ollama endpoint {endpoint.host} readmitted to the pool.")
+        endpoint.healthy = True
+        endpoint.failures = 0
+        endpoint.ejected_until = 0.0
+
+    def _mark_failure(self, endpoint: OllamaEndpoint, error: Exception):
+        endpoint.failures += 1
+        backoff = min(self.MAX_EJECT_SECONDS, self.BASE_EJECT_SECONDS * 2 ** (endpoint.failures - 1))
+        endpoint.ejected_until = time.monotonic() + backoff
+        if endpoint.healthy:
+            print(f"⚠️ Ollama endpoint {endpoint.host} ejected for {backoff:.0f}s. Details: {error}")
+        endpoint.healthy = False
+
+    @staticmethod
+    def _is_endpoint_failure(error: Exception) -> bool:
+        """
+        Only connection/transport errors and 502/503/504 mean the server is unusable.
+        Model/request errors and bugs in the caller (TypeError, KeyError, ...) are
+        raised as they are instead of ejecting every endpoint in turn.
+        """
+        if isinstance(error, ollama.ResponseError):
+            return error.status_code in (502, 503, 504)
+        return isinstance(error, (ConnectionError, httpx.TransportError))
+
+    # --- Routing ---
+    def _pick(self, model: Optional[str], exclude: set,
+              preferred: Optional[OllamaEndpoint] = None) -> Optional[OllamaEndpoint]:
+        """Selects (and reserves) the least loaded usable endpoint. Caller holds no lock."""
+        with self._lock:
+            now = time.monotonic()
+            candidates = [
+                e for e in self.endpoints
+                if e not in exclude
+                # An ejected endpoint whose backoff expired gets a trial request (half-open)
+                and (e.healthy or now >= e.ejected_until)
+                and (model is None or e.has_model(model))
+            ]
+            if not candidates:
+                return None
+
+            if preferred in candidates:
+                chosen = preferred
+            else:
+                least = min(e.outstanding for e in candidates)
+                # Random tie-break so idle endpoints share the load evenly
+                chosen = random.choice([e for e in candidates if e.outstanding == least])
+
+            chosen.outstanding += 1
+            return chosen
+
+    def _release(self, endpoint: OllamaEndpoint, error: Optional[Exception] = None):
+        with self._lock:
+            endpoint.outstanding -= 1
+            if error is None:
+                self._mark_success(endpoint)
+            elif self._is_endpoint_failure(error):
+                self._mark_failure(endpoint, error)
+
+    def call(self, method, route_model: Optional[str], *args,
+             preferred: Optional[OllamaEndpoint] = None, quick: bool = False, **kwargs):
+        """
+        Runs client.<method>(*args, **kwargs) on the best endpoint that has
+        `route_model`, failing over to the next one on endpoint errors.
+        `route_model` is only used for routing; pass the model to the client
+        method in args/kwargs as well. `method` may also be a function called
+        as method(client, *args, **kwargs). quick=True uses the endpoint's
+        short-timeout client. Returns (result, endpoint).
+        """
+        tried = set()
+        last_error: Optional[Exception] = None
+
+        while True:
+            endpoint = self._pick(route_model, tried, preferred)
+            if endpoint is None:
+                break
+            tried.add(endpoint)
+            try:
+                client = endpoint.probe_client if quick else endpoint.client
+                if callable(method):
+                    result = method(client, *args, **kwargs)
+                else:
+                    result = getattr(client, method)(*args, **kwargs)
+            except Exception as e:
+                self._release(endpoint, e)
+                if not self._is_endpoint_failure(e):
+                    raise
+                last_error = e
+                continue
+            self._release(endpoint)
+            return result, endpoint
+
+        if last_error is not None:
+            raise last_error
+        if route_model is not None and any(e.healthy for e in self.endpoints):
+            raise ollama.ResponseError(f"model '{route_model}' not found on any healthy endpoint", 404)
+        raise ConnectionError("No healthy Ollama endpoint available.")
+
+    # --- ollama.Client compatible surface ---
+    def chat(self, model: str = "", **kwargs):
+        return self.call(streamed_chat, model, model=model, **kwargs)[0]
+
+    def embed(self, model: str = "", **kwargs):
+        return self.call("embed", model, model=model, quick=True, **kwargs)[0]
+
+    def show(self, model: str):
+        return self.call("show", model, model, quick=True)[0]
+
+    def list(self):
+        """Union of the models available on all healthy endpoints."""
+        self.check_all()
+        seen: Dict[str, Any] = {}
+        for endpoint in self.endpoints:
+            if endpoint.healthy and endpoint.models:
+                for name in endpoint.models:
+                    seen.setdefault(name, {"model": name, "name": name})
+        return {"models": list(seen.values())}
+
+    def ps(self):
+        """Running models of every healthy endpoint, tagged with the host."""
+        running = []
+        for endpoint in self.endpoints:
+            if not endpoint.healthy:
+                continue
+            try:
+                for m in endpoint.probe_client.ps()['models']:
+                    running.append({**dict(m), "host": endpoint.host})
+            except Exception as e:
+                if not self._is_endpoint_failure(e):
+                    raise
+                with self._lock:
+                    self._mark_failure(endpoint, e)
+        return {"models": running}
+
+    def pull(self, model: str, stream: bool = False, **kwargs):
+        """Pulls the model onto every healthy endpoint that does not have it yet."""
+        self.check_all()
+        targets = [e for e in self.endpoints
+                   if e.healthy and not (e.models and normalize_model_name(model) in e.models)]
+        if stream:
+            return self._pull_stream(targets, model, **kwargs)
+        for endpoint in targets:
+            endpoint.client.pull(model, **kwargs)
+        self.check_all()
+        return {"status": "success"}
+
+    def _pull_stream(self, targets: List[OllamaEndpoint], model: str, **kwargs) -> Iterator[Dict[str, Any]]:
+        for endpoint in targets:
+            for chunk in endpoint.client.pull(model, stream=True, **kwargs):
+                chunk = dict(chunk)
+                if len(targets) > 1 and chunk.get('status'):
+                    chunk['status'] = f"[{endpoint.host}] {chunk['status']}"
+                yield chunk
+        self.check_all()
+
+    def session_client(self) -> "StickyPoolClient":
+        """Client view that keeps a conversation on one endpoint (see StickyPoolClient)."""
+        return StickyPoolClient(self)
+
+
+class StickyPoolClient:
+    """
+    Routes all chat calls of one ChatSession to the same endpoint while it is
+    healthy. The evaluated prompt prefix (KV cache) only exists on the server
+    that handled the previous turn, so hopping endpoints would lose it.
+    """
+
+    def __init__(self, pool: EndpointPool):
+        self.pool = pool
+        self.endpoint: Optional[OllamaEndpoint] = None
+
+    def chat(self, model: str = "", **kwargs):
+        result, self.endpoint = self.pool.call(streamed_chat, model, model=model,
+                                               preferred=self.endpoint, **kwargs)
+        return result
+
+    def __getattr__(self, name):
+        # Everything else is not session bound
+        return getattr(self.pool, name)
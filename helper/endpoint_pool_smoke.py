@@ -0,0 +1,222 @@
+"""
+Smoke test for EndpointPool against several local stand-in Ollama servers.
+
+Each stand-in is a tiny HTTP server on its own port that answers the API calls
+the app uses (/api/tags, /api/ps, /api/show, /api/chat, /api/embed) with canned
+responses, so the pool is exercised through the real ollama.Client without any
+model or GPU. Checks routing by model availability, load spreading, session
+stickiness, ejection of a dead server and readmission after it comes back.
+
+Usage (from the project root):
+    python -m helper.endpoint_pool_smoke
+"""
+import sys
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import List, Optional
+
+from helper.endpoint_pool import EndpointPool, StickyPoolClient, normalize_model_name
+
+
+class StandInServer:
+    """An HTTP server on 127.0.0.1 that pretends to be Ollama with the given models."""
+
+    def __init__(self, models: List[str], delay: float = 0.0, port: int = 0,
+                 chunks: int = 1, wedged: bool = False):
+        self.models = models
+        self.delay = delay # Seconds per chat chunk, so concurrent requests overlap
+        self.chunks = chunks # Streamed chat replies are sent in this many pieces
+        self.wedged = wedged # Accepts connections but never answers
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._port = port
+        self.httpd: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def host(self) -> str:
+        return f"http://127.0.0.1:{self._port}"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, payload, status=200):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream_chat(self, model):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.end_headers()
+                text = f"reply from {server.host}"
+                for i in range(server.chunks):
+                    time.sleep(server.delay)
+                    last = i == server.chunks - 1
+                    piece = text if last else ""
+                    chunk = {"model": model, "created_at": "2024-01-01T00:00:00Z", "done": last,
+                             "message": {"role": "assistant", "content": piece}}
+                    if last:
+                        chunk.update(prompt_eval_count=1, eval_count=server.chunks)
+                    self.wfile.write((json.dumps(chunk) + "\n").encode())
+                    self.wfile.flush()
+
+            def do_GET(self):
+                if server.wedged:
+                    time.sleep(30)
+                    return
+                if self.path == "/api/tags":
+                    self._reply({"models": [{"model": m, "name": m, "size": 1} for m in server.models]})
+                elif self.path == "/api/ps":
+                    self._reply({"models": []})
+                else:
+                    self._reply({"error": "not found"}, 404)
+
+            def do_POST(self):
+                if server.wedged:
+                    time.sleep(30)
+                    return
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                model = request.get("model", "")
+                if normalize_model_name(model) not in server.models:
+                    self._reply({"error": f"model '{model}' not found"}, 404)
+                    return
+                with server._lock:
+                    server.requests += 1
+                if self.path == "/api/chat" and request.get("stream", True):
+                    self._stream_chat(model)
+                elif self.path == "/api/chat":
+                    time.sleep(server.delay)
+                    self._reply({"model": model, "created_at": "2024-01-01T00:00:00Z", "done": True,
+                                 "message": {"role": "assistant", "content": f"reply from {server.host}"},
+                                 "prompt_eval_count": 1, "eval_count": 1})
+                elif self.path == "/api/embed":
+                    self._reply({"model": model, "embeddings": [[0.1, 0.2, 0.3]]})
+                elif self.path == "/api/show":
+                    self._reply({"model_info": {"general.architecture": "llama"}})
+                else:
+                    self._reply({"error": "not found"}, 404)
+
+        return Handler
+
+    def start(self) -> "StandInServer":
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", self._port), self._handler())
+        self._port = self.httpd.server_address[1]
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def run_smoke() -> List[str]:
+    """Runs every check and returns the failures (empty list = passed)."""
+    failures = []
+
+    def check(condition: bool, message: str):
+        print(f"{'✅' if condition else '🛑'} {message}")
+        if not condition:
+            failures.append(message)
+
+    a = StandInServer(["small:latest"], delay=0.2).start()
+    b = StandInServer(["small:latest", "big:latest"], delay=0.2).start()
+    # A port nobody listens on: a server that is down from the start
+    dead = StandInServer([]).start()
+    dead_host = dead.host
+    dead.stop()
+
+    pool = EndpointPool([a.host, b.host, dead_host], timeout=5.0, probe_timeout=5.0)
+    try:
+        pool.check_all()
+        dead_endpoint = next(e for e in pool.endpoints if e.host == dead_host)
+        check(not dead_endpoint.healthy, "unreachable server is ejected by the health check")
+
+        reply = pool.chat(model="small", messages=[{"role": "user", "content": "hi"}])
+        check(reply["message"]["content"].startswith("reply from"), "chat is routed and answered")
+
+        embedding = pool.embed(model="small", input="hi")
+        check(len(embedding["embeddings"][0]) == 3, "embed is routed and answered")
+
+        before_a, before_b = a.requests, b.requests
+        for _ in range(4):
+            pool.show("big")
+        check(a.requests == before_a and b.requests == before_b + 4, "show('big') only goes to the server that has it")
+
+        before_a, before_b = a.requests, b.requests
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            list(executor.map(lambda _: pool.chat(model="small", messages=[{"role": "user", "content": "hi"}]),
+                              range(6)))
+        check(a.requests > before_a and b.requests > before_b,
+              f"concurrent chats are spread over both servers (a={a.requests - before_a}, b={b.requests - before_b})")
+
+        sticky = StickyPoolClient(pool)
+        hosts = {sticky.chat(model="small", messages=[])["message"]["content"] for _ in range(4)}
+        check(len(hosts) == 1, "a session stays on one server")
+
+        try:
+            pool.chat(model="small", messages=[], unknown_argument=True)
+            check(False, "a caller error is raised")
+        except TypeError:
+            check(all(e.healthy for e in pool.endpoints if e.host != dead_host),
+                  "a caller error is raised as is, without ejecting servers")
+
+        # Server b goes away: requests keep working on a, and b is ejected
+        port_b = b._port
+        b.stop()
+        endpoint_b = next(e for e in pool.endpoints if e.host == b.host)
+        answered = 0
+        for _ in range(10):
+            answered += pool.chat(model="small", messages=[])["message"]["content"] == f"reply from {a.host}"
+        check(not endpoint_b.healthy and answered == 10, "a server that stops answering is ejected, requests fail over")
+
+        # ...and comes back on the same port: the next health check readmits it
+        b = StandInServer(["small:latest", "big:latest"], port=port_b).start()
+        pool.check_endpoint(endpoint_b)
+        check(endpoint_b.healthy, "a recovered server is readmitted")
+    finally:
+        pool.stop_health_checks()
+        a.stop()
+        b.stop()
+
+    # Read timeouts: 1s here. A slow generation that keeps sending chunks is not
+    # cut off, while a server that never answers fails fast.
+    slow = StandInServer(["small:latest"], delay=0.4, chunks=6).start()
+    wedged = StandInServer(["small:latest"], wedged=True).start()
+    try:
+        slow_pool = EndpointPool([slow.host], timeout=1.0, probe_timeout=1.0)
+        reply = slow_pool.chat(model="small", messages=[])
+        check(reply["message"]["content"] == f"reply from {slow.host}" and reply["eval_count"] == 6,
+              "a slow streamed chat (2.4s) is assembled and not cut off by the 1s read timeout")
+
+        for name, call in (("chat", lambda p: p.chat(model="small", messages=[])),
+                           ("show", lambda p: p.show("small")),
+                           ("embed", lambda p: p.embed(model="small", input="hi"))):
+            # A fresh pool each time so the server is not already ejected
+            wedged_pool = EndpointPool([wedged.host], timeout=1.0, probe_timeout=1.0)
+            start = time.monotonic()
+            try:
+                call(wedged_pool)
+                check(False, f"{name} on a wedged server fails")
+            except Exception:
+                check(time.monotonic() - start < 5, f"{name} on a wedged server fails within the read timeout")
+    finally:
+        slow.stop()
+        wedged.httpd.server_close()
+
+    return failures
+
+
+if __name__ == "__main__":
+    failed = run_smoke()
+    print(f"\n{'🛑 ' + str(len(failed)) + ' check(s) failed' if failed else '✅ All pool checks passed'}")
+    sys.exit(1 if failed else 0)
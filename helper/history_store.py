@@ -0,0 +1,156 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Optional, Dict, Any, List
+
+from helper.app_config import APP_DATA_DIR
+
+
+class HistoryStore:
+    """
+    Persistent history of results (translations, text and video summaries).
+
+    Backed by SQLite with an FTS5 index over the output, an input preview and
+    the source (URL), so searching stays in the millisecond range no matter
+    how many results are stored. If the SQLite build has no FTS5, search falls
+    back to LIKE queries.
+
+    Listing is keyset-paginated (before_id) so the UI can load rows lazily.
+    """
+
+    PREVIEW_CHARS = 300
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path: str = db_path or os.path.join(APP_DATA_DIR, "history.sqlite3")
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+
+        # Results are recorded from the GUI thread, but keep access serialized anyway
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self.has_fts: bool = self._create_schema()
+
+    def _create_schema(self) -> bool:
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    created REAL NOT NULL,
+                    task TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    input_hash TEXT NOT NULL,
+                    input_preview TEXT NOT NULL,
+                    output TEXT NOT NULL,
+                    source TEXT,
+                    duration_ms INTEGER,
+                    prompt_eval_ms INTEGER,
+                    eval_ms INTEGER
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_history_hash ON history (input_hash)")
+
+        try:
+            with self._conn:
+                fts_existed = self._conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'history_fts'"
+                ).fetchone() is not None
+                # External-content FTS table kept in sync by triggers
+                self._conn.executescript("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5(
+                        output, input_preview, source,
+                        content='history', content_rowid='id'
+                    );
+                    CREATE TRIGGER IF NOT EXISTS history_ai AFTER INSERT ON history BEGIN
+                        INSERT INTO history_fts(rowid, output, input_preview, source)
+                        VALUES (new.id, new.output, new.input_preview, new.source);
+                    END;
+                    CREATE TRIGGER IF NOT EXISTS history_ad AFTER DELETE ON history BEGIN
+                        INSERT INTO history_fts(history_fts, rowid, output, input_preview, source)
+                        VALUES ('delete', old.id, old.output, old.input_preview, old.source);
+                    END;
+                """)
+                if not fts_existed:
+                    # The triggers only cover new rows; index what is already there
+                    self._conn.execute("INSERT INTO history_fts(history_fts) VALUES ('rebuild')")
+            return True
+        except sqlite3.OperationalError as e:
+            print(f"⚠️ SQLite FTS5 not available, history search uses LIKE. Details: {e}")
+            return False
+
+    @staticmethod
+    def hash_input(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def add(self, task: str, model: str, input_text: str, output: str,
+            source: Optional[str] = None, duration_ms: Optional[int] = None,
+            stats: Optional[Dict[str, Any]] = None, input_hash: Optional[str] = None) -> int:
+        """
+        Records one result. `stats` is a ChatSession.last_stats dict (durations in ns).
+        `input_hash` is given when `input_text` is not the input itself (an opened
+        file is recorded by its path); otherwise `input_text` is hashed.
+        Returns the new row id.
+        """
+        if input_hash is None:
+            input_hash = self.hash_input(input_text)
+        stats = stats or {}
+        prompt_eval_ms = stats.get("prompt_eval_duration", 0) // 1_000_000 if stats else None
+        eval_ms = stats.get("eval_duration", 0) // 1_000_000 if stats else None
+
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO history (created, task, model, input_hash, input_preview, output, "
+                "source, duration_ms, prompt_eval_ms, eval_ms) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), task, model, input_hash,
+                 input_text[:self.PREVIEW_CHARS], output, source,
+                 duration_ms, prompt_eval_ms, eval_ms)
+            )
+            return cursor.lastrowid
+
+    @staticmethod
+    def _fts_query(text: str) -> str:
+        """Turns free text into a safe FTS5 query: every word is a quoted prefix term."""
+        terms = [t.replace('"', '""') for t in text.split()]
+        return " ".join(f'"{t}"*' for t in terms)
+
+    def search(self, text: str = "", limit: int = 50, before_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Returns up to `limit` entries, newest first, older than `before_id`.
+        Only the columns needed for a list row are returned; use get() for the output.
+        """
+        columns = "h.id, h.created, h.task, h.model, h.input_preview, h.source, substr(h.output, 1, 200) AS output_preview"
+        where, params = [], []
+
+        text = text.strip()
+        if text and self.has_fts:
+            sql = f"SELECT {columns} FROM history_fts f JOIN history h ON h.id = f.rowid"
+            where.append("history_fts MATCH ?")
+            params.append(self._fts_query(text))
+        else:
+            sql = f"SELECT {columns} FROM history h"
+            if text:
+                where.append("(h.output LIKE ? OR h.input_preview LIKE ? OR h.source LIKE ?)")
+                params.extend([f"%{text}%"] * 3)
+
+        if before_id is not None:
+            where.append("h.id < ?")
+            params.append(before_id)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY h.id DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def get(self, entry_id: int) -> Optional[Dict[str, Any]]:
+        """Loads the full entry, including the output text."""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM history WHERE id = ?", (entry_id,)).fetchone()
+        return dict(row) if row else None
+
+    def delete(self, entry_id: int):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM history WHERE id = ?", (entry_id,))
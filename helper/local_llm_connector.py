@@ -1,17 +1,68 @@
 import ollama
 import sys 
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+
+from helper.semantic_cache import SemanticCache
+from helper.history_store import HistoryStore
+from helper.auto_tuner import TuningProfiles
+from helper.admission_control import AdmissionController
+from helper.model_provisioner import ModelProvisioner, render_cli
+from helper.endpoint_pool import EndpointPool
+from helper.service_health import (
+    HealthMonitor, ResilientClient, make_timeout,
+    DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT, PROBE_READ_TIMEOUT
+)
 
 class LocalLLMConnector:
     """
     Handles connection and model management for the local Ollama API.
     It checks model availability at startup and attempts to pull the model 
     if it is not found locally.
+
+    With `hosts` (e.g. ["http://box1:11434", "http://box2:11434"]) the client is
+    an EndpointPool that load-balances over several Ollama servers instead of
+    the default local ollama.Client().
     """
     
-    def __init__(self, model_name: str = "ibm/granite3.2:8b"):
+    def __init__(self, model_name: str = "ibm/granite3.2:8b", embed_model: str = "nomic-embed-text",
+                 hosts: Optional[List[str]] = None,
+                 fallback_models: Optional[List[str]] = None,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout: Optional[float] = DEFAULT_READ_TIMEOUT):
         self.model: str = model_name
-        self.client: ollama.Client = ollama.Client() 
+        timeout = make_timeout(connect_timeout, read_timeout)
+        probe_timeout = make_timeout(connect_timeout, PROBE_READ_TIMEOUT)
+        self.is_pooled: bool = bool(hosts)
+        self.last_provisioner: Optional[ModelProvisioner] = None
+        if hosts:
+            raw_client = EndpointPool(hosts, timeout=timeout, probe_timeout=probe_timeout)
+            raw_client.check_all()
+            raw_client.start_health_checks()
+            probe_client = raw_client
+        else:
+            raw_client = ollama.Client(timeout=timeout)
+            probe_client = ollama.Client(timeout=probe_timeout)
+
+        # The monitor probes the server directly with a short read timeout;
+        # everything else goes through the ResilientClient, which fails fast
+        # while the service is down and retries transient errors. Quick calls
+        # (show/list/ps/embed) share the probe client's short read timeout.
+        # Call start_health_monitor() once Qt is up.
+        self.health_monitor: HealthMonitor = HealthMonitor(probe_client)
+        self.client: ResilientClient = ResilientClient(
+            raw_client, self.health_monitor, quick_client=None if hosts else probe_client
+        )
+        # Near-duplicate result cache shared by the summary workers
+        self.semantic_cache: SemanticCache = SemanticCache(self.client, embed_model=embed_model)
+        # Searchable record of every result, shown on the History page
+        self.history_store: HistoryStore = HistoryStore()
+        # Host-specific options written by `python -m helper.auto_tuner`
+        self.tuning_profiles: TuningProfiles = TuningProfiles()
+        # Checks memory/load before jobs are sent; RAM is only measurable for a local server
+        self.admission: AdmissionController = AdmissionController(
+            self.client, self.tuning_profiles, fallback_models=fallback_models, local=not hosts,
+            monitor=self.health_monitor
+        )
         # is_model_ready will be set by is_available_and_pull_if_needed
         self.is_model_ready: bool = False 
         
@@ -20,6 +71,21 @@ class LocalLLMConnector:
         
         print(f"LocalLLMConnector initialized for model: {self.model}")
 
+    def generation_kwargs(self, task: str) -> Dict[str, Any]:
+        """
+        Returns the tuned `options`/`keep_alive` for a task ("translation",
+        "text_summary", "video_summary"), or {} to use Ollama's defaults.
+        """
+        profile = self.tuning_profiles.get(self.model, task)
+        if not profile:
+            return {}
+        return {"options": dict(profile.get("options", {})), "keep_alive": profile.get("keep_alive")}
+
+    def start_health_monitor(self):
+        """Starts periodic background probing (needs a running QApplication for the signals)."""
+        if not self.health_monitor.isRunning():
+            self.health_monitor.start()
+
     def is_available_and_pull_if_needed(self) -> bool:
         """
         Checks if the model is locally available. 
@@ -57,49 +123,44 @@ class LocalLLMConnector:
         Returns True on successful pull, False on failure.
         """
         try:
-            # We use typing.Dict here for safety, though Dict[str, Any] is better 
-            # for the runtime type of the chunk.
-            chunk: Dict[str, Any]
-            for chunk in self.client.pull(self.model, stream=True):
-                
-                # If a chunk contains an error, raise it immediately
-                if chunk.get('error'):
-                    raise Exception(chunk['error'])
-
-                if 'status' in chunk:
-                    status = chunk['status']
-
-                    # NOTE: These values might be None for certain status messages, 
-                    # but casting them to int(0) handles the NoneType error robustly.
-                    total = int(chunk.get('total', 0) or 0)
-                    completed = int(chunk.get('completed', 0) or 0)
-
-                    # Only show progress bar if total size is known, completed is tracked, 
-                    # and the status is not a verification step ('digest').
-                    if total > 0 and completed >= 0 and 'digest' not in status.lower():
-                        # Calculate progress bar and percentage
-                        progress_len = 20
-                        fill_count = int(completed * progress_len / total)
-                        percentage = (completed / total) * 100
-                        
-                        # Use rjust to ensure the '=' characters don't exceed the length
-                        progress_bar = f"[{'='*fill_count:<{progress_len}}] {percentage:.2f}%"
-                        sys.stdout.write(f"\r{status} {progress_bar}")
-                        
-                    elif 'digest' not in status.lower():
-                        # Display status for non-download steps (e.g., verifying)
-                        sys.stdout.write(f"\r{status}...")
-                        
-                    sys.stdout.flush()
-
+            results = self.provision_models([self.model], on_progress=render_cli)
             sys.stdout.write("\n")
-            print(f"✅ Model '{self.model}' successfully pulled and ready.")
-            self.is_model_ready = True
-            return True
-
         except Exception as e:
-            # Catch pull failures, including the internal chunk errors
+            # e.g. a ResponseError from listing the installed models
             sys.stdout.write("\n")
             print(f"🛑 Error during model pull: {e}")
             self.is_model_ready = False
             return False
+
+        if results.get(self.model):
+            print(f"✅ Model '{self.model}' successfully pulled and ready.")
+            self.is_model_ready = True
+            return True
+
+        print(f"🛑 Error during model pull: {self.last_provisioner.progress[self.model].error}")
+        self.is_model_ready = False
+        return False
+
+    def make_provisioner(self, models: List[str], on_progress=None) -> ModelProvisioner:
+        """Creates the ModelProvisioner for `models` (kept as last_provisioner so it can be cancelled)."""
+        self.last_provisioner = ModelProvisioner(
+            self.client, models, local=not self.is_pooled, on_progress=on_progress
+        )
+        return self.last_provisioner
+
+    def provision_models(self, models: List[str], on_progress=None,
+                         provisioner: Optional[ModelProvisioner] = None) -> Dict[str, bool]:
+        """
+        Pulls several models concurrently (see ModelProvisioner) and returns
+        {model: success}. A failed disk space check marks every model as failed.
+        Pass a provisioner from make_provisioner() to be able to cancel it
+        before this call starts.
+        """
+        provisioner = provisioner or self.make_provisioner(models, on_progress)
+        try:
+            return provisioner.run()
+        except OSError as e:
+            # Disk space check failed, or the service could not be reached
+            for progress in provisioner.progress.values():
+                progress.error = progress.error or str(e)
+            return {m: False for m in provisioner.models}
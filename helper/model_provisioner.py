@@ -0,0 +1,277 @@
+import os
+import sys
+import time
+import shutil
+import random
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, List, Callable
+
+import httpx
+
+DEFAULT_REGISTRY = "https://registry.ollama.ai"
+# Our standard set for a new machine: simple/complicated summarizer + embeddings
+STANDARD_MODELS = ["ibm/granite3.2:8b", "mistral-small", "nomic-embed-text"]
+
+
+def split_model_name(name: str):
+    """'ibm/granite3.2:8b' -> ('ibm', 'granite3.2', '8b'); 'mistral-small' -> ('library', 'mistral-small', 'latest')."""
+    repo, _, tag = name.partition(":")
+    namespace, _, model = repo.rpartition("/")
+    return namespace or "library", model, tag or "latest"
+
+
+class PullProgress:
+    """Byte-level progress of one model, aggregated over its layers (digests)."""
+
+    def __init__(self, model: str):
+        self.model = model
+        self.status = "waiting"
+        self.layers: Dict[str, List[int]] = {} # digest -> [completed, total]
+        self.attempts = 0
+        self.done = False
+        self.error: Optional[str] = None
+
+    @property
+    def completed(self) -> int:
+        return sum(c for c, _ in self.layers.values())
+
+    @property
+    def total(self) -> int:
+        return sum(t for _, t in self.layers.values())
+
+    @property
+    def fraction(self) -> float:
+        if self.done:
+            return 1.0
+        return self.completed / self.total if self.total else 0.0
+
+
+class ModelProvisioner:
+    """
+    Pulls a declared list of models concurrently.
+
+    - Skips models that are already installed.
+    - Checks free disk space up front from the registry manifests (layer sizes)
+      when the Ollama server is local.
+    - Aggregates the byte counters of each pull stream into PullProgress objects
+      and reports them through `on_progress` (throttled), for the CLI or GUI.
+    - Retries interrupted pulls with backoff. Ollama keeps partially downloaded
+      blobs, so a retry resumes instead of starting over.
+    The registry URL is configurable so a local stand-in registry can be used.
+    """
+
+    PROGRESS_INTERVAL = 0.2 # Seconds between on_progress callbacks
+
+    def __init__(self, client, models: List[str], max_parallel: int = 3, retries: int = 3,
+                 registry_url: str = DEFAULT_REGISTRY, models_dir: Optional[str] = None,
+                 local: bool = True, on_progress: Optional[Callable[[Dict[str, PullProgress]], None]] = None):
+        self.client = client
+        self.models: List[str] = list(dict.fromkeys(models)) # De-duplicate, keep order
+        self.max_parallel = max_parallel
+        self.retries = retries
+        self.registry_url = registry_url.rstrip("/")
+        self.models_dir = models_dir or os.environ.get("OLLAMA_MODELS") or os.path.join(os.path.expanduser("~"), ".ollama", "models")
+        self.local = local
+        self.on_progress = on_progress
+
+        self.progress: Dict[str, PullProgress] = {m: PullProgress(m) for m in self.models}
+        self._lock = threading.Lock()
+        self._cancel_event = threading.Event()
+        self._last_report = 0.0
+
+    # --- Planning ---
+    def installed_models(self) -> set:
+        names = set()
+        for m in self.client.list()['models']:
+            name = m.get('model') or m.get('name')
+            if name:
+                names.add(name)
+                if name.endswith(":latest"):
+                    names.add(name[:-len(":latest")])
+        return names
+
+    def manifest_size(self, model: str) -> Optional[int]:
+        """Total bytes of a model's layers according to the registry, or None if unknown."""
+        namespace, name, tag = split_model_name(model)
+        url = f"{self.registry_url}/v2/{namespace}/{name}/manifests/{tag}"
+        try:
+            response = httpx.get(url, timeout=10.0, follow_redirects=True,
+                                 headers={"Accept": "application/vnd.docker.distribution.manifest.v2+json"})
+            response.raise_for_status()
+            manifest = response.json()
+            layers = manifest.get("layers", []) + [manifest.get("config") or {}]
+            return sum(int(layer.get("size", 0) or 0) for layer in layers)
+        except Exception as e:
+            print(f"⚠️ Could not read manifest for '{model}'. Details: {e}")
+            return None
+
+    def check_disk_space(self, models: List[str]):
+        """
+        Returns (ok, needed_bytes, free_bytes). Unknown sizes count as 0 and a
+        remote server is not checked (ok=True, free_bytes=None).
+        """
+        needed = sum(self.manifest_size(m) or 0 for m in models)
+        if not self.local:
+            return True, needed, None
+        # The models folder may not exist yet; check the closest existing parent
+        path = self.models_dir
+        while not os.path.exists(path) and os.path.dirname(path) != path:
+            path = os.path.dirname(path)
+        free = shutil.disk_usage(path).free
+        # Keep 10% headroom: blobs are written next to partial files while verifying
+        return needed * 1.1 <= free, needed, free
+
+    # --- Pulling ---
+    def cancel(self):
+        """Stops all pulls; partial downloads stay on disk and resume on the next run."""
+        self._cancel_event.set()
+
+    def _report(self, force: bool = False):
+        if self.on_progress is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_report < self.PROGRESS_INTERVAL:
+                return
+            self._last_report = now
+        self.on_progress(self.progress)
+
+    def _pull_one(self, model: str) -> bool:
+        progress = self.progress[model]
+        while True:
+            if self._cancel_event.is_set():
+                progress.status, progress.error = "cancelled", "cancelled"
+                self._report(force=True)
+                return False
+
+            progress.attempts += 1
+            stream = None
+            try:
+                stream = self.client.pull(model, stream=True)
+                for chunk in stream:
+                    if self._cancel_event.is_set():
+                        raise InterruptedError("cancelled")
+                    if chunk.get('error'):
+                        raise Exception(chunk['error'])
+
+                    progress.status = chunk.get('status') or progress.status
+                    digest = chunk.get('digest')
+                    total = int(chunk.get('total', 0) or 0)
+                    if digest and total:
+                        progress.layers[digest] = [int(chunk.get('completed', 0) or 0), total]
+                    self._report()
+
+                progress.done = True
+                progress.status = "success"
+                self._report(force=True)
+                return True
+
+            except Exception as e:
+                if isinstance(e, InterruptedError) or self._cancel_event.is_set():
+                    continue # Handled at the top of the loop
+                progress.error = str(e)
+                if progress.attempts > self.retries:
+                    progress.status = "failed"
+                    self._report(force=True)
+                    return False
+                delay = min(30.0, 2 ** progress.attempts) * random.uniform(0.5, 1.0)
+                progress.status = f"interrupted, resuming in {delay:.0f}s"
+                self._report(force=True)
+                self._cancel_event.wait(delay)
+            finally:
+                close = getattr(stream, "close", None)
+                if close:
+                    close() # Ends the HTTP stream when a pull is abandoned mid-way
+
+    def run(self, check_disk: bool = True) -> Dict[str, bool]:
+        """Pulls every missing model concurrently. Returns {model: success}."""
+        if self._cancel_event.is_set():
+            # Cancelled before it started: do not contact the server or the registry
+            for p in self.progress.values():
+                p.status, p.error = "cancelled", "cancelled"
+            self._report(force=True)
+            return {m: False for m in self.models}
+
+        installed = self.installed_models()
+        missing = [m for m in self.models if m not in installed]
+        results = {m: True for m in self.models if m not in missing}
+        for m in results:
+            self.progress[m].done, self.progress[m].status = True, "already installed"
+
+        if missing and check_disk:
+            ok, needed, free = self.check_disk_space(missing)
+            if not ok:
+                message = (f"Not enough disk space: need ~{needed / 2**30:.1f} GiB, "
+                           f"{free / 2**30:.1f} GiB free in {self.models_dir}.")
+                for m in missing:
+                    self.progress[m].status, self.progress[m].error = "skipped", message
+                self._report(force=True)
+                raise OSError(message)
+
+        self._report(force=True)
+        with ThreadPoolExecutor(max_workers=max(1, self.max_parallel)) as pool:
+            try:
+                for model, ok in zip(missing, pool.map(self._pull_one, missing)):
+                    results[model] = ok
+            except KeyboardInterrupt:
+                # Let the pull threads stop at their next chunk before the pool joins them
+                self.cancel()
+                raise
+        return results
+
+
+def render_cli(progress: Dict[str, PullProgress]):
+    """One-line aggregated progress for the console."""
+    parts = []
+    for p in progress.values():
+        if p.done:
+            parts.append(f"{p.model}: done")
+        elif p.error and p.status in ("failed", "skipped", "cancelled"):
+            parts.append(f"{p.model}: {p.status}")
+        else:
+            parts.append(f"{p.model}: {p.fraction * 100:.0f}%")
+    completed = sum(p.completed for p in progress.values())
+    total = sum(p.total for p in progress.values())
+    overall = f"{completed / 2**30:.2f}/{total / 2**30:.2f} GiB" if total else "starting"
+    sys.stdout.write(f"\r[{overall}] " + " | ".join(parts) + " " * 10)
+    sys.stdout.flush()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Pull a set of Ollama models concurrently.")
+    parser.add_argument("models", nargs="*", default=STANDARD_MODELS, help="Models to pull (default: standard set).")
+    parser.add_argument("--host", default=None, help="Ollama host (default: OLLAMA_HOST or localhost).")
+    parser.add_argument("--registry", default=DEFAULT_REGISTRY, help="Registry used for the disk space check.")
+    parser.add_argument("--parallel", type=int, default=3, help="Concurrent pulls.")
+    parser.add_argument("--skip-disk-check", action="store_true")
+    args = parser.parse_args(argv)
+
+    import ollama
+    client = ollama.Client(host=args.host)
+    local = args.host is None or any(h in args.host for h in ("localhost", "127.0.0.1"))
+
+    provisioner = ModelProvisioner(client, args.models, max_parallel=args.parallel,
+                                   registry_url=args.registry, local=local, on_progress=render_cli)
+    try:
+        results = provisioner.run(check_disk=not args.skip_disk_check)
+    except KeyboardInterrupt:
+        provisioner.cancel()
+        sys.stdout.write("\n")
+        print("🛑 Interrupted. Partial downloads are kept and resume on the next run.")
+        return 1
+    except OSError as e:
+        sys.stdout.write("\n")
+        print(f"🛑 {e}")
+        return 1
+
+    sys.stdout.write("\n")
+    for model, ok in results.items():
+        print(f"{'✅' if ok else '🛑'} {model}: {provisioner.progress[model].status}"
+              + ("" if ok else f" ({provisioner.progress[model].error})"))
+    return 0 if all(results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,4 @@
+import os
 import sys
 from PyQt6.QtCore import pyqtSignal, QThread
 
@@ -8,6 +9,33 @@ except ImportError:
     print("Please install it using: pip install ollama")
     sys.exit(1)
 
+from contextlib import nullcontext
+
+from helper.chat_session import ChatSession, SessionFullError, format_stats
+from helper.admission_control import AdmissionDecision, AdmissionError
+
+
+def admit_job(admission, model, task, text, options, notify, allow_downgrade=True):
+    """
+    Runs admission control for a worker before it contacts the model.
+    Returns the decision (None when admission control is disabled);
+    queue/downgrade messages are passed to `notify` for the UI.
+    """
+    if admission is None:
+        return None
+    decision = admission.admit(model, task, text, options, allow_downgrade=allow_downgrade)
+    if decision.action in (AdmissionDecision.QUEUE, AdmissionDecision.DOWNGRADE):
+        notify(decision.message)
+    return decision
+
+
+def job_slot(admission, decision, cancelled):
+    """Context manager holding an admission slot (waits if queued, raises if rejected)."""
+    if admission is None or decision is None:
+        return nullcontext()
+    return admission.run(decision, cancelled=cancelled)
+
+
 
 class OllamaWorkerTranslate(QThread):
     """Worker thread to handle sequential LLM tasks (Detection then Translation)."""
@@ -15,60 +43,77 @@ class OllamaWorkerTranslate(QThread):
     result_ready = pyqtSignal(str) 
     # Signal to update the Language Detected label
     language_detected = pyqtSignal(str) 
+    # Signal for queue/downgrade notices from admission control
+    progress_update = pyqtSignal(str)
     # Signal for errors
     error_occurred = pyqtSignal(str)
 
-    def __init__(self, client, model_name, source_text, target_lang):
+    def __init__(self, client, model_name, source_text, target_lang, options=None, keep_alive=None,
+                 admission=None):
         super().__init__()
         self.client = client
         self.model = model_name
         self.source_text = source_text
         self.target_lang = target_lang
         self.detected_lang = "" # Store the detected language
+        # Tuned generation settings (see LocalLLMConnector.generation_kwargs)
+        self.options = options
+        self.keep_alive = keep_alive
+        # Optional AdmissionController guarding the shared inference host
+        self.admission = admission
 
     def _call_llm(self, messages):
         """Helper to make the synchronous Ollama API call."""
         # This part remains similar to your original run() logic
-        response = self.client.chat(model=self.model, messages=messages)
+        response = self.client.chat(model=self.model, messages=messages,
+                                    options=self.options, keep_alive=self.keep_alive)
         return response['message']['content'].strip()
 
     def run(self):
         """Performs language detection (Step 1) and then translation (Step 2)."""
         try:
-            # --- STEP 1: Language Detection ---
-            detection_prompt = "Detect the language of the following text. Respond with ONLY the language name (e.g., 'English' or 'French') and nothing else."
+            decision = admit_job(self.admission, self.model, "translation", self.source_text,
+                                 self.options, self.progress_update.emit)
+            if decision is not None and decision.action == AdmissionDecision.DOWNGRADE:
+                self.model = decision.model
+
+            with job_slot(self.admission, decision, self.isInterruptionRequested):
+                # --- STEP 1: Language Detection ---
+                detection_prompt = "Detect the language of the following text. Respond with ONLY the language name (e.g., 'English' or 'French') and nothing else."
             
-            messages_detect = [
-                {"role": "system", "content": detection_prompt},
-                {"role": "user", "content": self.source_text}
-            ]
+                messages_detect = [
+                    {"role": "system", "content": detection_prompt},
+                    {"role": "user", "content": self.source_text}
+                ]
             
-            # Call LLM for detection
-            detected_lang_raw = self._call_llm(messages_detect)
+                # Call LLM for detection
+                detected_lang_raw = self._call_llm(messages_detect)
             
-            # Simple cleanup, ensuring it's a single word/phrase
-            self.detected_lang = detected_lang_raw.split('\n')[0].strip()
+                # Simple cleanup, ensuring it's a single word/phrase
+                self.detected_lang = detected_lang_raw.split('\n')[0].strip()
             
-            # Emit the detected language back to the UI
-            self.language_detected.emit(self.detected_lang)
+                # Emit the detected language back to the UI
+                self.language_detected.emit(self.detected_lang)
 
-            # --- STEP 2: Translation ---
-            system_prompt = (
-                f"You are a professional language translator. Translate the user's text from {self.detected_lang} to {self.target_lang}. "
-                "Only provide the translated text and nothing else."
-            )
+                # --- STEP 2: Translation ---
+                system_prompt = (
+                    f"You are a professional language translator. Translate the user's text from {self.detected_lang} to {self.target_lang}. "
+                    "Only provide the translated text and nothing else."
+                )
             
-            messages_translate = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": self.source_text}
-            ]
+                messages_translate = [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": self.source_text}
+                ]
             
-            # Call LLM for translation
-            translation = self._call_llm(messages_translate)
+                # Call LLM for translation
+                translation = self._call_llm(messages_translate)
             
-            # Emit the final translation result
-            self.result_ready.emit(translation)
+                # Emit the final translation result
+                self.result_ready.emit(translation)
 
+        except AdmissionError as e:
+            self.error_occurred.emit(f"Job not admitted: {e}")
         except Exception as e:
             # Catch any API or connection errors
             self.error_occurred.emit(f"LLM operation failed. Details: {e}")
@@ -78,57 +123,144 @@ class OllamaWorkerTranslate(QThread):
 class TextSummaryWorker(QThread):
     """Worker thread for simple, one-shot LLM tasks (like Summarization)."""
     result_ready = pyqtSignal(str) 
+    # Signal with the per-request timing line (prompt eval / generation)
+    telemetry_ready = pyqtSignal(str)
+    # Signal with a previous result for a near-identical input and its similarity
+    cache_hit = pyqtSignal(str, float)
+    # Signal for queue/downgrade notices from admission control
+    progress_update = pyqtSignal(str)
     error_occurred = pyqtSignal(str)
 
-    def __init__(self, client, model_name, prompt, system_prompt):
+    def __init__(self, client, model_name, prompt, system_prompt, cache=None, use_cache=True,
+                 options=None, keep_alive=None, admission=None):
         super().__init__()
         self.client = client
         self.model = model_name
         # Note the parameter names here: prompt and system_prompt
         self.prompt = prompt
         self.system_prompt = system_prompt
+        # Optional SemanticCache; use_cache=False still stores the new result
+        self.cache = cache
+        self.use_cache = use_cache
+        # Optional AdmissionController guarding the shared inference host
+        self.admission = admission
+        # The session is kept by the page so follow-ups can reuse the evaluated prefix
+        self.session = ChatSession(self.client, self.model, self.system_prompt,
+                                   keep_alive=keep_alive, options=options)
 
     def run(self):
-        messages = []
-        if self.system_prompt:
-            messages.append({"role": "system", "content": self.system_prompt})
-            
-        messages.append({"role": "user", "content": self.prompt})
-
         try:
-            response = self.client.chat(
-                model=self.model,
-                messages=messages
-            )
-            self.result_ready.emit(response['message']['content'])
+            vector = None
+            scope = None
+            if self.cache is not None:
+                scope = self.cache.make_scope("text_summary", self.model, self.system_prompt or "")
+                vector = self.cache.embed(self.prompt)
+                hit = self.cache.lookup(vector, scope, self.prompt) if self.use_cache else None
+                if hit:
+                    self.cache_hit.emit(*hit)
+                    return
+
+            decision = admit_job(self.admission, self.model, "text_summary", self.prompt,
+                                 self.session.options, self.progress_update.emit)
+            downgraded = decision is not None and decision.action == AdmissionDecision.DOWNGRADE
+            if downgraded:
+                self.model = self.session.model = decision.model
+
+            with job_slot(self.admission, decision, self.isInterruptionRequested):
+                summary = self.session.ask(self.prompt)
+            if self.admission is not None:
+                self.admission.record(self.model, self.session.last_stats)
+
+            self.telemetry_ready.emit(format_stats(self.session.last_stats))
+            self.result_ready.emit(summary)
+
+            # A fallback model's summary is not cached under the requested model
+            if self.cache is not None and not downgraded:
+                self.cache.add(vector, scope, self.prompt, summary)
         
+        except AdmissionError as e:
+            self.error_occurred.emit(f"Job not admitted: {e}")
         except ollama.ResponseError as e:
             self.error_occurred.emit(f"Ollama API Error (Model '{self.model}'): {e}")
         except Exception as e:
             self.error_occurred.emit(f"Connection Error: Is the Ollama service running? Details: {e}")
 
+
+# --- Follow-up worker ---
+class FollowUpWorker(QThread):
+    """Worker thread that asks a follow-up question on an existing ChatSession."""
+    result_ready = pyqtSignal(str)
+    telemetry_ready = pyqtSignal(str)
+    # Signal for queue/downgrade notices from admission control
+    progress_update = pyqtSignal(str)
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, session, question, task="text_summary", admission=None):
+        super().__init__()
+        self.session = session
+        self.model = session.model
+        self.question = question
+        # Task the session belongs to, for the admission estimate
+        self.task = task
+        # Optional AdmissionController guarding the shared inference host
+        self.admission = admission
+
+    def run(self):
+        try:
+            # With the model loaded only the question is new (the history is the cached
+            # prefix); otherwise the whole conversation has to be evaluated again.
+            text = self.question
+            if self.admission is not None and not self.admission.is_loaded(self.model):
+                text = "\n".join(m["content"] for m in self.session.messages) + "\n" + self.question
+            # A conversation stays on its model: a fallback model has none of its cached
+            # prefix, so the follow-up is queued or rejected instead of switched
+            decision = admit_job(self.admission, self.model, self.task, text,
+                                 self.session.options, self.progress_update.emit, allow_downgrade=False)
+
+            with job_slot(self.admission, decision, self.isInterruptionRequested):
+                answer = self.session.ask(self.question)
+            if self.admission is not None:
+                self.admission.record(self.model, self.session.last_stats)
+
+            self.telemetry_ready.emit(format_stats(self.session.last_stats))
+            self.result_ready.emit(answer)
+
+        except AdmissionError as e:
+            self.error_occurred.emit(f"Job not admitted: {e}")
+        except SessionFullError as e:
+            self.error_occurred.emit(str(e))
+        except ollama.ResponseError as e:
+            self.error_occurred.emit(f"Ollama API Error (Model '{self.session.model}'): {e}")
+        except Exception as e:
+            self.error_occurred.emit(f"Connection Error: Is the Ollama service running? Details: {e}")
+
 # --- Ollama Worker for Video Summary ---
 # Only transcript so its similar to text
 
-# Import the external library needed for YouTube transcripts
-# pip install youtube-transcript-api
-
-from youtube_transcript_api import YouTubeTranscriptApi   
+# The external library needed for YouTube transcripts (pip install youtube-transcript-api)
+# is imported when the first video worker is created, not at app startup.
 from urllib.parse import urlparse, parse_qs
 
 class VideoSummaryWorker(QThread):
     """Worker thread to fetch a YouTube transcript and summarize it with an LLM."""
     result_ready = pyqtSignal(str) 
     progress_update = pyqtSignal(str) # To update the UI on step changes
+    telemetry_ready = pyqtSignal(str)
+    cache_hit = pyqtSignal(str, float)
     error_occurred = pyqtSignal(str)
 
-    def __init__(self, client, model_name, video_url):
+    def __init__(self, client, model_name, video_url, cache=None, use_cache=True,
+                 options=None, keep_alive=None, admission=None):
         super().__init__()
         self.client = client
         self.model = model_name
         self.video_url = video_url
+        self.cache = cache
+        self.use_cache = use_cache
+        self.admission = admission
 
         try:
+            from youtube_transcript_api import YouTubeTranscriptApi
             self.yt_api_client = YouTubeTranscriptApi()
         except Exception as e:
             # Handle potential initialization errors (e.g., if the __init__ requires more)
@@ -141,6 +273,9 @@ class VideoSummaryWorker(QThread):
             "arguments, and conclusions. The final summary **must be in English**, and you "
             "must **only** output the summary text."
         )
+        # Holds the transcript conversation so the page can ask follow-ups on it
+        self.session = ChatSession(self.client, self.model, self.system_prompt,
+                                   keep_alive=keep_alive, options=options)
 
     def _get_youtube_id(self, url):
         """Extracts the YouTube video ID from a URL.""" 
@@ -154,12 +289,9 @@ class VideoSummaryWorker(QThread):
 
     def _call_llm(self, text_to_summarize):
         """Helper to make the Ollama API call for summarization."""
-        messages = [
-            {"role": "system", "content": self.system_prompt},
-            {"role": "user", "content": text_to_summarize}
-        ]
-        response = self.client.chat(model=self.model, messages=messages)
-        return response['message']['content'].strip()
+        summary = self.session.ask(text_to_summarize)
+        self.telemetry_ready.emit(format_stats(self.session.last_stats))
+        return summary
 
     def run(self):
         if self.yt_api_client is None:
@@ -189,15 +321,309 @@ class VideoSummaryWorker(QThread):
                 self.error_occurred.emit("Transcript fetched, but it was empty.")
                 return
 
-            # --- STEP 2: Summarize with LLM ---
-            self.progress_update.emit("Sending transcript to LLM for summarization (Step 2/2)...")
-            
-            # Call LLM for summarization
-            summary = self._call_llm(transcript_text)
+            # Transcripts of the same video differ slightly between fetches,
+            # so look for a near-duplicate before paying for a new summary.
+            vector = None
+            scope = None
+            if self.cache is not None:
+                scope = self.cache.make_scope("video_summary", self.model, self.system_prompt)
+                vector = self.cache.embed(transcript_text)
+                hit = self.cache.lookup(vector, scope, transcript_text) if self.use_cache else None
+                if hit:
+                    self.cache_hit.emit(*hit)
+                    return
+
+            # The transcript length is only known now, so admission happens here
+            decision = admit_job(self.admission, self.model, "video_summary", transcript_text,
+                                 self.session.options, self.progress_update.emit)
+            downgraded = decision is not None and decision.action == AdmissionDecision.DOWNGRADE
+            if downgraded:
+                self.model = self.session.model = decision.model
+
+            with job_slot(self.admission, decision, self.isInterruptionRequested):
+                # --- STEP 2: Summarize with LLM ---
+                self.progress_update.emit("Sending transcript to LLM for summarization (Step 2/2)...")
+                
+                # Call LLM for summarization
+                summary = self._call_llm(transcript_text)
+            if self.admission is not None:
+                self.admission.record(self.model, self.session.last_stats)
             
             # Emit the final result
             self.result_ready.emit(summary)
 
+            if self.cache is not None and not downgraded:
+                self.cache.add(vector, scope, transcript_text, summary)
+
+        except AdmissionError as e:
+            self.error_occurred.emit(f"Job not admitted: {e}")
         except Exception as e:
             # Catch errors like no transcript available, network issues, or LLM failure
             self.error_occurred.emit(f"Failed to process video. Check if subtitles/transcript are available. Error: {e}")
+
+
+# --- Model provisioning worker ---
+class ProvisioningWorker(QThread):
+    """Worker thread that pulls several models concurrently and reports byte progress."""
+    # {model: (fraction 0-1, completed bytes, total bytes, status)}
+    progress_changed = pyqtSignal(dict)
+    # {model: success}
+    provisioning_done = pyqtSignal(dict)
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, llm_connector, models):
+        super().__init__()
+        self.llm_connector = llm_connector
+        self.models = models
+        # Created up front so a Cancel click before run() starts still reaches it
+        self.provisioner = llm_connector.make_provisioner(models, on_progress=self._emit_progress)
+
+    def _emit_progress(self, progress):
+        # Plain tuples cross the thread boundary; PullProgress objects keep changing
+        self.progress_changed.emit({
+            model: (p.fraction, p.completed, p.total, p.status)
+            for model, p in progress.items()
+        })
+
+    def run(self):
+        try:
+            results = self.llm_connector.provision_models(self.models, provisioner=self.provisioner)
+            self.provisioning_done.emit(results)
+        except Exception as e:
+            self.error_occurred.emit(f"Model provisioning failed. Details: {e}")
+
+    def cancel(self):
+        self.provisioner.cancel()
+
+
+# --- Large file workers ---
+# Documents opened from disk are streamed chunk by chunk (helper/document_source.py)
+# so the whole text never sits in a widget or in one messages list.
+
+class FileSummaryWorker(QThread):
+    """
+    Worker thread that summarizes a large file: one summary per chunk, then the
+    partial summaries are reduced level by level into one.
+
+    Partial summaries are merged in batches that fit in `chunk_chars` as soon as
+    a batch is full, so at most one batch per level is held in memory and no
+    combine prompt is larger than the context window, however long the file.
+    """
+    result_ready = pyqtSignal(str)
+    progress_update = pyqtSignal(str)
+    telemetry_ready = pyqtSignal(str)
+    error_occurred = pyqtSignal(str)
+
+    COMBINE_PROMPT = ("These are summaries of consecutive parts of one document. "
+                      "{instruction}:\n\n{parts}")
+    PROMPT_OVERHEAD_CHARS = 300 # Instruction and "Part i:" labels in a combine prompt
+
+    def __init__(self, client, model_name, document, system_prompt, chunk_chars,
+                 options=None, keep_alive=None, admission=None):
+        super().__init__()
+        self.client = client
+        self.model = model_name
+        self.document = document
+        self.system_prompt = system_prompt
+        self.chunk_chars = chunk_chars
+        self.options = options
+        self.keep_alive = keep_alive
+        self.admission = admission
+        # Session of the final (combining) step; the page keeps it for follow-ups
+        self.session = ChatSession(self.client, self.model, self.system_prompt,
+                                   keep_alive=keep_alive, options=options)
+
+    def _ask(self, session, prompt):
+        """Sends one prompt on `session` through admission control."""
+        decision = admit_job(self.admission, session.model, "text_summary", prompt,
+                             self.options, self.progress_update.emit)
+        if decision is not None and decision.action == AdmissionDecision.DOWNGRADE:
+            session.model = decision.model
+
+        with job_slot(self.admission, decision, self.isInterruptionRequested):
+            summary = session.ask(prompt)
+        if self.admission is not None:
+            self.admission.record(session.model, session.last_stats)
+        return summary
+
+    def _ask_once(self, prompt):
+        """Sends one prompt in its own short-lived session."""
+        session = ChatSession(self.client, self.model, self.system_prompt,
+                              keep_alive=self.keep_alive, options=self.options)
+        return self._ask(session, prompt)
+
+    def _combine_prompt(self, summaries, instruction):
+        parts = "\n\n".join(f"Part {i}: {s}" for i, s in enumerate(summaries, start=1))
+        return self.COMBINE_PROMPT.format(instruction=instruction, parts=parts)
+
+    def _merge(self, summaries, level):
+        self.progress_update.emit(f"Combining {len(summaries)} partial summaries (level {level + 1})...")
+        return self._ask_once(self._combine_prompt(
+            summaries, "Combine them into one summary of this section, keeping the key facts"))
+
+    def _push(self, levels, summary, level=0):
+        """Adds a summary at `level`, merging that level's batch upward once it is full."""
+        budget = self.chunk_chars - self.PROMPT_OVERHEAD_CHARS
+        while True:
+            if level == len(levels):
+                levels.append([])
+            batch = levels[level]
+            if batch and sum(len(s) for s in batch) + len(summary) > budget:
+                levels[level] = [summary]
+                summary = self._merge(batch, level)
+                level += 1
+            else:
+                batch.append(summary)
+                return
+
+    def run(self):
+        try:
+            estimated = self.document.estimated_chunks(self.chunk_chars)
+            levels = [] # levels[k]: summaries waiting to be merged at reduction level k
+            parts = 0
+            for index, chunk in enumerate(self.document.iter_chunks(self.chunk_chars), start=1):
+                if self.isInterruptionRequested():
+                    return
+                self.progress_update.emit(f"Summarizing part {index} of ~{estimated} from {self.document.name}...")
+                self._push(levels, self._ask_once(
+                    f"Summarize this part ({index}) of a longer document:\n\n{chunk}"))
+                parts = index
+
+            if not parts:
+                self.error_occurred.emit(f"No text could be read from '{self.document.name}'.")
+                return
+
+            # Carry what is left on the lower levels up until only the top batch remains
+            level = 0
+            while level < len(levels) - 1:
+                if self.isInterruptionRequested():
+                    return
+                batch, levels[level] = levels[level], []
+                if batch:
+                    self._push(levels, batch[0] if len(batch) == 1 else self._merge(batch, level), level + 1)
+                level += 1
+            top = levels[-1]
+
+            if len(top) == 1:
+                # One summary already covers the whole file; keep it as session history
+                summary = top[0]
+                self.session.messages += [
+                    {"role": "user", "content": f"Summarize the document '{self.document.name}'."},
+                    {"role": "assistant", "content": summary},
+                ]
+            else:
+                self.progress_update.emit(f"Combining {len(top)} partial summaries...")
+                summary = self._ask(self.session, self._combine_prompt(
+                    top, "Write one coherent summary of the whole document"))
+                self.model = self.session.model
+                self.telemetry_ready.emit(format_stats(self.session.last_stats))
+
+            self.result_ready.emit(summary)
+
+        except AdmissionError as e:
+            self.error_occurred.emit(f"Job not admitted: {e}")
+        except ollama.ResponseError as e:
+            self.error_occurred.emit(f"Ollama API Error (Model '{self.model}'): {e}")
+        except Exception as e:
+            self.error_occurred.emit(f"Failed to summarize '{self.document.name}'. Details: {e}")
+
+
+class FileTranslateWorker(QThread):
+    """
+    Worker thread that translates a large file chunk by chunk.
+    The translation is streamed to `output_path`; only the first part is emitted for display.
+    If the job fails or is stopped, the partial output file is removed again.
+    """
+    result_ready = pyqtSignal(str)
+    language_detected = pyqtSignal(str)
+    progress_update = pyqtSignal(str)
+    error_occurred = pyqtSignal(str)
+
+    PREVIEW_CHARS = 4000
+
+    def __init__(self, client, model_name, document, target_lang, output_path, chunk_chars,
+                 options=None, keep_alive=None, admission=None):
+        super().__init__()
+        self.client = client
+        self.model = model_name
+        self.document = document
+        self.target_lang = target_lang
+        self.output_path = output_path
+        self.chunk_chars = chunk_chars
+        self.options = options
+        self.keep_alive = keep_alive
+        self.admission = admission
+
+    def _call_llm(self, system_prompt, text):
+        response = self.client.chat(
+            model=self.model,
+            messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": text}],
+            options=self.options, keep_alive=self.keep_alive
+        )
+        return response['message']['content'].strip()
+
+    def run(self):
+        created = completed = False
+        try:
+            estimated = self.document.estimated_chunks(self.chunk_chars)
+            preview = ""
+            detected_lang = ""
+            system_prompt = ""
+
+            # "x": never overwrite an existing file (the page picks a free name)
+            with open(self.output_path, "x", encoding="utf-8") as out:
+                created = True
+                for index, chunk in enumerate(self.document.iter_chunks(self.chunk_chars), start=1):
+                    if self.isInterruptionRequested():
+                        return
+
+                    decision = admit_job(self.admission, self.model, "translation", chunk,
+                                         self.options, self.progress_update.emit)
+                    if decision is not None and decision.action == AdmissionDecision.DOWNGRADE:
+                        # The rest of the file stays on the fallback model for a consistent translation
+                        self.model = decision.model
+                    with job_slot(self.admission, decision, self.isInterruptionRequested):
+                        if index == 1:
+                            # The language is detected once, from the first chunk
+                            detected_lang = self._call_llm(
+                                "Detect the language of the following text. Respond with ONLY the "
+                                "language name (e.g., 'English' or 'French') and nothing else.",
+                                chunk
+                            ).split('\n')[0].strip()
+                            self.language_detected.emit(detected_lang)
+                            system_prompt = (
+                                f"You are a professional language translator. Translate the user's text from "
+                                f"{detected_lang} to {self.target_lang}. Only provide the translated text and nothing else."
+                            )
+
+                        self.progress_update.emit(f"Translating part {index} of ~{estimated}...")
+                        translation = self._call_llm(system_prompt, chunk)
+
+                    out.write(translation + "\n\n")
+                    out.flush()
+                    if len(preview) < self.PREVIEW_CHARS:
+                        preview += translation + "\n\n"
+
+            if not detected_lang:
+                self.error_occurred.emit(f"No text could be read from '{self.document.name}'.")
+                return
+
+            completed = True
+            self.result_ready.emit(
+                f"[Full translation saved to {self.output_path}]\n\n{preview[:self.PREVIEW_CHARS]}"
+            )
+
+        except AdmissionError as e:
+            self.error_occurred.emit(f"Job not admitted: {e}")
+        except Exception as e:
+            self.error_occurred.emit(f"Failed to translate '{self.document.name}'. Details: {e}")
+        finally:
+            if created and not completed:
+                self._remove_partial_output()
+
+    def _remove_partial_output(self):
+        """Deletes an incomplete translation so it is not mistaken for a finished one."""
+        try:
+            os.remove(self.output_path)
+        except OSError as e:
+            print(f"⚠️ Could not remove incomplete translation '{self.output_path}'. Details: {e}")
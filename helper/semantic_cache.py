@@ -0,0 +1,244 @@
+import os
+import json
+import hashlib
+import time
+import threading
+from typing import Optional, Dict, Any, List, Tuple
+
+from helper.app_config import APP_DATA_DIR
+
+# NumPy is imported (and the index read from disk) on first use, not at startup
+np = None
+
+
+class SemanticCache:
+    """
+    Near-duplicate result cache backed by embeddings from a local Ollama model.
+
+    Inputs are embedded and compared (cosine similarity) against every stored
+    vector in one matrix-vector product, so lookups stay fast at tens of
+    thousands of entries. On disk the index is two append-only files:
+      - vectors.f32   : raw float32 rows, one normalized vector per entry
+      - entries.jsonl : one JSON object per entry (scope, result, timestamp)
+    Appending avoids rewriting the whole index whenever a result is added.
+
+    Results are only compared within the same scope (task + model + prompt),
+    so a French translation is never offered for a German request.
+    """
+
+    # Long documents are embedded from a head and a tail segment (averaged into
+    # one vector) to keep the embedding call cheap; the middle is covered by
+    # comparing lengths. An article extended or edited near its end therefore
+    # no longer looks identical to the old one.
+    SEGMENT_CHARS = 4000
+    MIN_LENGTH_RATIO = 0.95
+
+    def __init__(self, client, embed_model: str = "nomic-embed-text",
+                 cache_dir: Optional[str] = None, threshold: float = 0.97):
+        self.client = client
+        self.embed_model: str = embed_model
+        self.threshold: float = threshold
+        self.cache_dir: str = cache_dir or os.path.join(APP_DATA_DIR, "semantic_cache")
+        self.enabled: bool = True
+        self._loaded: bool = False
+        self._load_lock = threading.Lock()
+
+        self._lock = threading.Lock()
+        self._entries: List[Dict[str, Any]] = []
+        self._scope_ids: Dict[str, int] = {}
+        self._vectors = None      # (capacity, dim) float32, rows [:_count] are valid
+        self._entry_scopes = None # (capacity,) int32 scope id per row
+        self._entry_lengths = None # (capacity,) int64 normalized input length per row, -1 if unknown
+        self._count: int = 0
+
+        self._vectors_path = os.path.join(self.cache_dir, "vectors.f32")
+        self._entries_path = os.path.join(self.cache_dir, "entries.jsonl")
+
+    # --- Persistence ---
+    def _ensure_loaded(self) -> bool:
+        """Imports NumPy and reads the index the first time the cache is used."""
+        if self._loaded:
+            return self.enabled
+        global np
+        with self._load_lock:
+            if not self._loaded:
+                try:
+                    import numpy
+                    np = numpy
+                except ImportError:
+                    # The cache is an optimization only; without NumPy it disables itself.
+                    print("⚠️ NumPy is not installed; semantic result cache is disabled.")
+                    self.enabled = False
+                else:
+                    self._load()
+                self._loaded = True
+        return self.enabled
+
+    def _load(self):
+        """Loads the on-disk index, tolerating a partially written last entry."""
+        if not os.path.exists(self._entries_path) or not os.path.exists(self._vectors_path):
+            return
+
+        try:
+            entries = []
+            corrupt_tail = False
+            with open(self._entries_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        corrupt_tail = True
+                        break
+
+            if not entries:
+                return
+
+            dim = int(entries[0]["dim"])
+            flat = np.fromfile(self._vectors_path, dtype=np.float32)
+            rows = min(len(entries), flat.size // dim)
+
+            self._grow(rows, dim)
+            self._vectors[:rows] = flat[:rows * dim].reshape(rows, dim)
+            for i, entry in enumerate(entries[:rows]):
+                self._entry_scopes[i] = self._scope_id(entry["scope"])
+                # Entries written before lengths were stored are never matched
+                self._entry_lengths[i] = int(entry.get("length", -1))
+            self._entries = entries[:rows]
+            self._count = rows
+
+            # Drop any half-written tail so future appends stay row-aligned
+            if flat.size != rows * dim:
+                os.truncate(self._vectors_path, rows * dim * 4)
+            if corrupt_tail or len(entries) != rows:
+                with open(self._entries_path, "w", encoding="utf-8") as f:
+                    f.writelines(json.dumps(entry) + "\n" for entry in self._entries)
+            print(f"Semantic cache loaded: {rows} entries.")
+
+        except Exception as e:
+            print(f"⚠️ Could not load semantic cache, starting empty. Details: {e}")
+            self._entries, self._count = [], 0
+            self._vectors, self._entry_scopes, self._entry_lengths = None, None, None
+            self._scope_ids = {}
+
+    def _grow(self, needed: int, dim: int):
+        """Ensures capacity for `needed` rows, doubling to keep appends amortized O(1)."""
+        if self._vectors is not None and self._vectors.shape[0] >= needed:
+            return
+        capacity = max(1024, needed)
+        if self._vectors is not None:
+            capacity = max(capacity, self._vectors.shape[0] * 2)
+
+        vectors = np.zeros((capacity, dim), dtype=np.float32)
+        scopes = np.full(capacity, -1, dtype=np.int32)
+        lengths = np.full(capacity, -1, dtype=np.int64)
+        if self._vectors is not None:
+            vectors[:self._count] = self._vectors[:self._count]
+            scopes[:self._count] = self._entry_scopes[:self._count]
+            lengths[:self._count] = self._entry_lengths[:self._count]
+        self._vectors, self._entry_scopes, self._entry_lengths = vectors, scopes, lengths
+
+    def _scope_id(self, scope: str) -> int:
+        if scope not in self._scope_ids:
+            self._scope_ids[scope] = len(self._scope_ids)
+        return self._scope_ids[scope]
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        # Whitespace differences should not change the vector or the length
+        return " ".join(text.split())
+
+    # --- Public API ---
+    @staticmethod
+    def make_scope(task: str, model: str, prompt: str = "") -> str:
+        """Builds the scope key; results are only reused for the same task, model and prompt."""
+        return f"{task}|{model}|{hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:12]}"
+
+    def embed(self, text: str):
+        """
+        Returns the normalized embedding of `text`, or None if the cache is
+        disabled or the embedding model is unavailable.
+        """
+        if not self.enabled or not self._ensure_loaded():
+            return None
+
+        normalized = self._normalize(text)
+        if len(normalized) <= 2 * self.SEGMENT_CHARS:
+            segments = [normalized]
+        else:
+            segments = [normalized[:self.SEGMENT_CHARS], normalized[-self.SEGMENT_CHARS:]]
+        try:
+            response = self.client.embed(model=self.embed_model, input=segments)
+            rows = np.asarray(response['embeddings'], dtype=np.float32)
+            norms = np.linalg.norm(rows, axis=1, keepdims=True)
+            vector = (rows / np.where(norms > 0, norms, 1.0)).mean(axis=0)
+        except ConnectionError as e:
+            # Service outage: skip the cache for this request only
+            print(f"⚠️ Embedding skipped, service unavailable. Details: {e}")
+            return None
+        except Exception as e:
+            print(f"⚠️ Embedding with '{self.embed_model}' failed; semantic cache disabled. Details: {e}")
+            self.enabled = False
+            return None
+
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else None
+
+    def lookup(self, vector, scope: str, text: str) -> Optional[Tuple[str, float]]:
+        """
+        Finds the most similar stored result within `scope` for the input
+        `text` (embedded as `vector`). Entries whose input length differs by
+        more than MIN_LENGTH_RATIO are skipped. Returns (result, similarity)
+        above the threshold, otherwise None.
+        """
+        if vector is None or not self.enabled:
+            return None
+
+        with self._lock:
+            if self._count == 0 or scope not in self._scope_ids:
+                return None
+            if self._vectors.shape[1] != vector.shape[0]:
+                return None  # Index was built with a different embedding model
+
+            # One vectorized pass over all rows; other scopes are masked out
+            similarities = self._vectors[:self._count] @ vector
+            similarities[self._entry_scopes[:self._count] != self._scope_ids[scope]] = -1.0
+            # The vector only covers the head and tail; a different length means different content
+            length = len(self._normalize(text))
+            stored = self._entry_lengths[:self._count]
+            ratio = np.minimum(stored, length) / np.maximum(np.maximum(stored, length), 1)
+            similarities[(stored < 0) | (ratio < self.MIN_LENGTH_RATIO)] = -1.0
+            best = int(np.argmax(similarities))
+            score = float(similarities[best])
+
+            if score < self.threshold:
+                return None
+            return self._entries[best]["result"], score
+
+    def add(self, vector, scope: str, text: str, result: str):
+        """Stores a result under its input's vector and length and appends it to disk."""
+        if vector is None or not self.enabled:
+            return
+
+        with self._lock:
+            dim = vector.shape[0]
+            if self._vectors is not None and self._vectors.shape[1] != dim:
+                return
+
+            length = len(self._normalize(text))
+            entry = {"scope": scope, "result": result, "dim": dim, "length": length, "created": time.time()}
+            self._grow(self._count + 1, dim)
+            self._vectors[self._count] = vector
+            self._entry_scopes[self._count] = self._scope_id(scope)
+            self._entry_lengths[self._count] = length
+            self._entries.append(entry)
+            self._count += 1
+
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                # Vector first: on load, entries without a full vector row are dropped
+                with open(self._vectors_path, "ab") as f:
+                    f.write(vector.astype(np.float32).tobytes())
+                with open(self._entries_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry) + "\n")
+            except OSError as e:
+                print(f"⚠️ Could not persist semantic cache entry. Details: {e}")
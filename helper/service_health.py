@@ -0,0 +1,223 @@
+import time
+import random
+import threading
+from typing import Optional
+
+import httpx
+import ollama
+from PyQt6.QtCore import pyqtSignal, QObject
+
+from helper.endpoint_pool import streamed_chat
+
+
+# Fail fast when the server is not reachable, but never cut off a generation.
+# Chat calls are streamed (see endpoint_pool.streamed_chat), so the read timeout
+# only limits the silence between chunks. It still has to cover the prompt
+# evaluation before the first token, which takes minutes for a long input on a
+# CPU. Quick calls (show, list, ps, embed) and health probes use a short one.
+DEFAULT_CONNECT_TIMEOUT = 3.0
+DEFAULT_READ_TIMEOUT = 300.0
+PROBE_READ_TIMEOUT = 10.0
+
+
+def make_timeout(connect: float = DEFAULT_CONNECT_TIMEOUT,
+                 read: Optional[float] = DEFAULT_READ_TIMEOUT) -> httpx.Timeout:
+    """Per-request timeout passed to ollama.Client (forwarded to httpx)."""
+    return httpx.Timeout(read, connect=connect)
+
+
+class ServiceUnavailableError(ConnectionError):
+    """Raised immediately (without contacting the server) while the service is known to be down."""
+
+
+class HealthMonitor(QObject):
+    """
+    Probes the Ollama service on a background thread and tracks its state.
+
+    States:
+      - "unknown"  : not probed yet, requests are allowed
+      - "up"       : probe succeeded quickly
+      - "degraded" : probe was slow, or some pooled endpoints are ejected
+      - "down"     : probe failed; new requests fail fast with ServiceUnavailableError
+    The probe is GET /api/ps (client.ps()), which does not touch any model.
+
+    The loop runs on a daemon threading.Thread rather than a QThread: a probe
+    of a wedged server can block for the connect plus read timeout (once per
+    endpoint for a pool), and a QThread still running at exit aborts the app.
+    status_changed is still delivered on the GUI thread (queued connection).
+    """
+    status_changed = pyqtSignal(str, str) # (state, human readable detail)
+
+    UNKNOWN = "unknown"
+    UP = "up"
+    DEGRADED = "degraded"
+    DOWN = "down"
+
+    def __init__(self, client, interval: float = 5.0, degraded_latency: float = 1.5):
+        super().__init__()
+        # The raw client (not the ResilientClient) so probes are never short-circuited
+        self.client = client
+        self.interval = interval
+        self.degraded_latency = degraded_latency
+        self.state: str = self.UNKNOWN
+        self.detail: str = ""
+        self.last_checked: float = 0.0
+        self._wake_event = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_down(self) -> bool:
+        return self.state == self.DOWN
+
+    def probe(self):
+        """Runs one probe and updates the state. Safe to call from any thread."""
+        start = time.monotonic()
+        try:
+            if hasattr(self.client, "endpoints"):
+                # EndpointPool: probe every endpoint, down only if none is left
+                self.client.check_all()
+                healthy = sum(1 for e in self.client.endpoints if e.healthy)
+                total = len(self.client.endpoints)
+                if healthy == 0:
+                    raise ConnectionError(f"All {total} Ollama endpoints are unreachable.")
+                latency = time.monotonic() - start
+                if healthy < total:
+                    self._set_state(self.DEGRADED, f"{healthy}/{total} endpoints up")
+                    return
+            else:
+                self.client.ps()
+                latency = time.monotonic() - start
+
+            if latency > self.degraded_latency:
+                self._set_state(self.DEGRADED, f"slow response ({latency:.1f}s)")
+            else:
+                self._set_state(self.UP, f"responding in {latency * 1000:.0f} ms")
+
+        except Exception as e:
+            self._set_state(self.DOWN, f"Ollama service is not reachable. Details: {e}")
+
+    def report_failure(self, error: Exception):
+        """Called by ResilientClient after retries were exhausted; re-probes right away."""
+        self._set_state(self.DOWN, f"Request failed: {error}")
+        self._wake_event.set()
+
+    def _set_state(self, state: str, detail: str):
+        self.last_checked = time.monotonic()
+        changed = state != self.state
+        self.state, self.detail = state, detail
+        if changed and not self._stopping:
+            print(f"Ollama service state: {state} ({detail})")
+            self.status_changed.emit(state, detail)
+
+    def _run(self):
+        while not self._stopping:
+            self.probe()
+            # Re-check faster while the service is down so recovery is noticed quickly
+            wait = self.interval / 2 if self.is_down else self.interval
+            self._wake_event.wait(wait)
+            self._wake_event.clear()
+
+    def isRunning(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="ollama-health-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Returns at once; a probe still in flight ends with its timeout (daemon thread)."""
+        self._stopping = True
+        self._wake_event.set()
+
+
+class ResilientClient:
+    """
+    Wraps an ollama.Client (or EndpointPool) used by the workers.
+
+    - Fails immediately with ServiceUnavailableError while the monitor reports "down".
+    - Retries transient errors (connection refused/reset, connect timeout,
+      502/503/504) with jittered exponential backoff. Read timeouts are not
+      retried: the server accepted the request and a retry would repeat a
+      long generation.
+    - Streams chat calls and sends show/list/ps/embed to `quick_client`
+      (short read timeout) when one is given; an EndpointPool does both itself.
+    """
+
+    RETRIES = 2
+    BASE_DELAY = 0.5
+    MAX_DELAY = 4.0
+
+    QUICK_METHODS = ("show", "list", "ps", "embed")
+
+    def __init__(self, client, monitor: Optional[HealthMonitor] = None, quick_client=None):
+        self.inner = client
+        self.monitor = monitor
+        self.quick_client = quick_client
+
+    @staticmethod
+    def _is_transient(error: Exception) -> bool:
+        if isinstance(error, ServiceUnavailableError):
+            return False
+        if isinstance(error, ollama.ResponseError):
+            return error.status_code in (502, 503, 504)
+        if isinstance(error, httpx.ReadTimeout):
+            return False
+        return isinstance(error, (ConnectionError, httpx.TransportError))
+
+    def _check_available(self):
+        if self.monitor is not None and self.monitor.is_down:
+            raise ServiceUnavailableError(self.monitor.detail or "Ollama service is down.")
+
+    def _target(self, method: str):
+        if method in self.QUICK_METHODS and self.quick_client is not None:
+            return getattr(self.quick_client, method)
+        if method == "chat" and isinstance(self.inner, ollama.Client):
+            return lambda *args, **kwargs: streamed_chat(self.inner, *args, **kwargs)
+        return getattr(self.inner, method)
+
+    def _call(self, method: str, *args, **kwargs):
+        self._check_available()
+        attempt = 0
+        while True:
+            try:
+                return self._target(method)(*args, **kwargs)
+            except Exception as e:
+                if not self._is_transient(e):
+                    raise
+                if attempt >= self.RETRIES:
+                    if self.monitor is not None:
+                        self.monitor.report_failure(e)
+                    raise
+                # Full jitter: spread retries of concurrent workers apart
+                delay = random.uniform(0, min(self.MAX_DELAY, self.BASE_DELAY * 2 ** attempt))
+                time.sleep(delay)
+                attempt += 1
+
+    def chat(self, *args, **kwargs):
+        return self._call("chat", *args, **kwargs)
+
+    def embed(self, *args, **kwargs):
+        return self._call("embed", *args, **kwargs)
+
+    def show(self, *args, **kwargs):
+        return self._call("show", *args, **kwargs)
+
+    def list(self, *args, **kwargs):
+        return self._call("list", *args, **kwargs)
+
+    def ps(self, *args, **kwargs):
+        return self._call("ps", *args, **kwargs)
+
+    def pull(self, *args, **kwargs):
+        # Streams are not retried mid-way; only the availability check applies
+        self._check_available()
+        return self.inner.pull(*args, **kwargs)
+
+    def __getattr__(self, name):
+        if name == "session_client":
+            # Only exists for pools; keeps sessions pinned to one endpoint (see StickyPoolClient)
+            factory = getattr(self.inner, "session_client")
+            return lambda: ResilientClient(factory(), self.monitor)
+        return getattr(self.inner, name)
@@ -0,0 +1,77 @@
+import os
+import sys
+import json
+import time
+from contextlib import contextmanager
+from typing import List, Tuple
+
+from helper.app_config import APP_DATA_DIR
+
+
+class StartupProfiler:
+    """
+    Records how long each startup phase (imports, connector, window, pages) takes.
+
+    Enabled with the --profile-startup flag; otherwise phase() is a no-op so the
+    instrumentation can stay in place. The report is printed once the event
+    loop has painted the first window, and appended to
+    ~/.ai_desktop_helper/startup_profile.jsonl so cold-start numbers can be
+    compared between versions.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled: bool = enabled
+        self.start: float = time.perf_counter()
+        # (name, offset from start, duration) in seconds
+        self.phases: List[Tuple[str, float, float]] = []
+        self.reported: bool = False
+
+    @contextmanager
+    def phase(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - begin
+            if self.reported:
+                # After first paint (e.g. a page built on first use): just print it
+                print(f"[startup profile] {name}: {duration * 1000:.1f} ms")
+            else:
+                self.phases.append((name, begin - self.start, duration))
+
+    def mark(self, name: str):
+        """Records a point in time (zero-length phase), e.g. 'first paint'."""
+        if self.enabled:
+            self.phases.append((name, time.perf_counter() - self.start, 0.0))
+
+    def report(self):
+        """Prints the phase table and appends it to the profile log."""
+        if not self.enabled or self.reported:
+            return
+        self.reported = True
+        total = time.perf_counter() - self.start
+
+        print("\n--- Startup profile ---")
+        print(f"{'phase':<48} {'at (ms)':>9} {'took (ms)':>10}")
+        for name, offset, duration in self.phases:
+            took = f"{duration * 1000:10.1f}" if duration else f"{'':>10}"
+            print(f"{name:<48} {offset * 1000:9.1f} {took}")
+        print(f"{'total until first paint':<48} {total * 1000:9.1f}")
+
+        try:
+            os.makedirs(APP_DATA_DIR, exist_ok=True)
+            with open(os.path.join(APP_DATA_DIR, "startup_profile.jsonl"), "a", encoding="utf-8") as f:
+                f.write(json.dumps({
+                    "time": time.time(),
+                    "total_ms": round(total * 1000, 1),
+                    "phases": [{"name": n, "at_ms": round(o * 1000, 1), "ms": round(d * 1000, 1)}
+                               for n, o, d in self.phases],
+                }) + "\n")
+        except OSError as e:
+            print(f"⚠️ Could not save startup profile. Details: {e}")
+
+
+profiler = StartupProfiler(enabled="--profile-startup" in sys.argv)
@@ -1,18 +1,32 @@
+import os
 import sys
-from PyQt6.QtWidgets import (
-    QApplication, QMainWindow, QWidget, QVBoxLayout,
-    QHBoxLayout, QStackedWidget, QMessageBox
-)
-from PyQt6.QtCore import Qt
+import importlib
 
-from helper.local_llm_connector import LocalLLMConnector
+# Imported first so the phases below are timed (enabled with --profile-startup)
+from helper.startup_profiler import profiler
 
-from asset.page_translator import TranslatorPage
-from asset.page_summary_text import TextSummaryPage
-from asset.page_summary_video import VideoSummaryPage
+with profiler.phase("import PyQt6"):
+    from PyQt6.QtWidgets import (
+        QApplication, QMainWindow, QWidget, QVBoxLayout,
+        QHBoxLayout, QStackedWidget, QMessageBox
+    )
+    from PyQt6.QtCore import Qt, QTimer
+
+with profiler.phase("import connector (ollama, httpx)"):
+    from helper.local_llm_connector import LocalLLMConnector
 
 from asset.sidebar_button import SidebarButton
 
+# Pages are imported and built the first time they are shown, so startup only
+# pays for the first page (the video page pulls in youtube_transcript_api, etc.).
+# Index -> (module, class); the index matches the sidebar button order.
+PAGES = {
+    0: ("asset.page_translator", "TranslatorPage"),
+    1: ("asset.page_summary_text", "TextSummaryPage"),
+    2: ("asset.page_summary_video", "VideoSummaryPage"),
+    3: ("asset.page_history", "HistoryPage"),
+}
+
 class MainWindow(QMainWindow):
     """Main window of the application with the sidebar and stacked content."""
     def __init__(self, llm_connector):
@@ -43,14 +57,8 @@ class MainWindow(QMainWindow):
         self.stacked_widget = QStackedWidget()
         self.stacked_widget.setStyleSheet("background-color: #F8F9F9;")
         
-        # --- Create Pages and add to Stacked Widget (PASSING CONNECTOR) ---
-        self.translator_page = TranslatorPage(self.llm_connector) 
-        self.summary_page = TextSummaryPage(self.llm_connector)
-        self.video_page = VideoSummaryPage(self.llm_connector)
-        
-        self.stacked_widget.addWidget(self.translator_page)
-        self.stacked_widget.addWidget(self.summary_page)
-        self.stacked_widget.addWidget(self.video_page)
+        # --- Pages are created on demand (see switch_page) ---
+        self.pages = {} # index -> page widget, only for pages already built
         
         # --- Create Sidebar Buttons and connect ---
         
@@ -66,13 +74,18 @@ class MainWindow(QMainWindow):
         self.btn_video = SidebarButton("[>]", "Youtube Summary")
         self.btn_video.clicked.connect(lambda: self.switch_page(2))
         
+        # Button 4: History
+        self.btn_history = SidebarButton("[#]", "History")
+        self.btn_history.clicked.connect(lambda: self.switch_page(3))
+        
         # Add buttons to sidebar layout
         sidebar_layout.addWidget(self.btn_translator)
         sidebar_layout.addWidget(self.btn_summary)
         sidebar_layout.addWidget(self.btn_video)
+        sidebar_layout.addWidget(self.btn_history)
         
         # Ensure only one button is checked at a time
-        self.button_group = [self.btn_translator, self.btn_summary, self.btn_video]
+        self.button_group = [self.btn_translator, self.btn_summary, self.btn_video, self.btn_history]
         for button in self.button_group:
             button.clicked.connect(lambda checked, b=button: self.update_button_states(b))
             
@@ -84,6 +97,14 @@ class MainWindow(QMainWindow):
         main_layout.addWidget(self.sidebar)
         main_layout.addWidget(self.stacked_widget)
 
+        # Only the first page is built at startup
+        self.switch_page(0)
+
+        # --- Service status (fed by the background health monitor) ---
+        self.statusBar().showMessage("Ollama service: checking...")
+        self.llm_connector.health_monitor.status_changed.connect(self.update_service_status)
+        self.llm_connector.start_health_monitor()
+
     def update_button_states(self, current_button):
         """Ensures only the clicked button remains checked/active."""
         for button in self.button_group:
@@ -92,18 +113,36 @@ class MainWindow(QMainWindow):
             else:
                 button.setChecked(True)
 
+    def update_service_status(self, state, detail):
+        """Shows the current Ollama service state in the status bar."""
+        colors = {"up": "#27AE60", "degraded": "#E67E22", "down": "#C0392B"}
+        self.statusBar().setStyleSheet(f"color: {colors.get(state, '#2C3E50')};")
+        self.statusBar().showMessage(f"Ollama service: {state.upper()} - {detail}")
+
+    def create_page(self, index):
+        """Imports and builds the page for `index` (PASSING CONNECTOR)."""
+        module_name, class_name = PAGES[index]
+        with profiler.phase(f"import {module_name}"):
+            page_class = getattr(importlib.import_module(module_name), class_name)
+        with profiler.phase(f"build {class_name}"):
+            page = page_class(self.llm_connector)
+        self.stacked_widget.addWidget(page)
+        return page
+
     def switch_page(self, index):
-        """Switches the page displayed in the QStackedWidget."""
-        self.stacked_widget.setCurrentIndex(index)
+        """Switches the page displayed in the QStackedWidget, building it on first use."""
+        page = self.pages.get(index)
+        if page is None:
+            page = self.pages[index] = self.create_page(index)
+        self.stacked_widget.setCurrentWidget(page)
 
     def closeEvent(self, event):
         """Checks for active threads before allowing the window to close."""
-        # Check all your pages for active threads
-        pages = [self.translator_page, self.summary_page, self.video_page]
-        
-        for page in pages:
+        # Check all pages built so far for active threads
+        for page in self.pages.values():
             if hasattr(page, 'thread') and page.thread and page.thread.isRunning():
-                # Ask the thread to stop gracefully by exiting its event loop
+                # Ask the thread to stop gracefully (also aborts jobs waiting in the admission queue)
+                page.thread.requestInterruption()
                 page.thread.quit()
                 # Wait a small amount of time for the thread to finish
                 page.thread.wait(1000) # Wait up to 1s
@@ -117,16 +156,36 @@ class MainWindow(QMainWindow):
             # the old one's reference in self.thread will be overwritten.
             # If your OllamaWorker is a QThread, this cleanup should work.
 
+        self.llm_connector.health_monitor.stop()
+
         # Allow the close event to proceed
         event.accept()
 
 if __name__ == '__main__':
     # --- LLM initialization ---
     MODEL_TO_USE = "ibm/granite3.2:8b"
-    llm_connector = LocalLLMConnector(model_name=MODEL_TO_USE)
+    # Comma separated list of Ollama servers to load-balance over (optional)
+    OLLAMA_HOSTS = [h.strip() for h in os.environ.get("OLLAMA_HOSTS", "").split(",") if h.strip()]
+    # Smaller models admission control may switch to when the main one does not fit in memory
+    FALLBACK_MODELS = ["granite3.2:2b"]
+    with profiler.phase("create LocalLLMConnector"):
+        llm_connector = LocalLLMConnector(model_name=MODEL_TO_USE, hosts=OLLAMA_HOSTS or None,
+                                          fallback_models=FALLBACK_MODELS)
+
+    # The QApplication must exist before any dialog (including the error box below)
+    with profiler.phase("create QApplication"):
+        app = QApplication(sys.argv)
+        app.setStyle("Fusion")
+
+    # Optional: pull the standard model set concurrently with a progress dialog
+    if "--provision" in sys.argv:
+        from asset.provisioning_dialog import ProvisioningDialog
+        from helper.model_provisioner import STANDARD_MODELS
+        ProvisioningDialog(llm_connector, [MODEL_TO_USE] + [m for m in STANDARD_MODELS if m != MODEL_TO_USE]).exec()
     
     # 1. Blocking Model Check/Pull: Ensures the model is ready before the UI starts
-    is_ready = llm_connector.is_available_and_pull_if_needed()
+    with profiler.phase("model availability check"):
+        is_ready = llm_connector.is_available_and_pull_if_needed()
 
     if not is_ready:
         QMessageBox.critical(None, "Fatal Error", 
@@ -136,9 +195,11 @@ if __name__ == '__main__':
         sys.exit(1)
 
     # 2. Start the PyQt Application
-    app = QApplication(sys.argv)
-    app.setStyle("Fusion")
-    
-    window = MainWindow(llm_connector)
-    window.show()
+    with profiler.phase("create MainWindow"):
+        window = MainWindow(llm_connector)
+    with profiler.phase("show MainWindow"):
+        window.show()
+    if profiler.enabled:
+        # Runs once the event loop has processed the first paint
+        QTimer.singleShot(0, lambda: (profiler.mark("first paint"), profiler.report()))
     sys.exit(app.exec())
\ No newline at end of file